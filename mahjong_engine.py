@@ -0,0 +1,504 @@
+"""Headless Mahjong Solitaire rules engine.
+
+Nothing in this module imports pygame, so boards can be dealt, played and
+undone in simulations, servers and tests. ``mahjong_game.py`` is a thin pygame
+client on top of :class:`Board`.
+"""
+import random
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NUM_CHARACTERS = 12
+# Backward deals that strand a single free tile are retried this many times
+SOLVABLE_DEAL_ATTEMPTS = 50
+
+
+@dataclass
+class TilePosition:
+    x: int  # Grid X
+    y: int  # Grid Y
+    z: int  # Layer (height)
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z))
+
+    def __eq__(self, other):
+        return self.x == other.x and self.y == other.y and self.z == other.z
+
+
+Move = Tuple[TilePosition, TilePosition]
+
+
+def create_pyramid_layout() -> List[TilePosition]:
+    """Easy level - Turtle shape (~90 tiles, 3 layers)"""
+    positions = []
+    occupied = set()
+
+    def add_tile(tx: int, ty: int, z: int):
+        key = (tx, ty, z)
+        if key not in occupied:
+            occupied.add(key)
+            positions.append(TilePosition(tx, ty, z))
+
+    def add_rect(x0: int, y0: int, w: int, h: int, z: int):
+        for ty in range(y0, y0 + h):
+            for tx in range(x0, x0 + w):
+                add_tile(tx, ty, z)
+
+    # Core turtle shell (84 tiles)
+    # Layer 0: 9x6
+    add_rect(0, 0, 9, 6, 0)
+    # Layer 1: 6x4 centered
+    add_rect(1, 1, 6, 4, 1)
+    # Layer 2: 3x2 centered
+    add_rect(3, 2, 3, 2, 2)
+
+    # Add side legs to reach 90 tiles (3 per side)
+    add_rect(-1, 2, 1, 3, 0)
+    add_rect(9, 2, 1, 3, 0)
+
+    return positions
+
+
+def create_temple_layout() -> List[TilePosition]:
+    """Medium level - Temple layout (~88-90 tiles, 3 layers)"""
+    layout = [
+        # === LAYER 0 (Bottom) ===
+        # Top row
+        (0, 0, 0), (2, 0, 0), (4, 0, 0), (6, 0, 0), (8, 0, 0), (10, 0, 0), (12, 0, 0), (14, 0, 0),
+        # Second row
+        (1, 1, 0), (3, 1, 0), (5, 1, 0), (7, 1, 0), (9, 1, 0), (11, 1, 0), (13, 1, 0),
+        # Third row (main body)
+        (0, 2, 0), (1, 2, 0), (2, 2, 0), (3, 2, 0), (4, 2, 0), (5, 2, 0), (6, 2, 0),
+        (7, 2, 0), (8, 2, 0), (9, 2, 0), (10, 2, 0), (11, 2, 0), (12, 2, 0), (13, 2, 0),
+        (14, 2, 0),
+        # Fourth row (main body)
+        (1, 3, 0), (2, 3, 0), (3, 3, 0), (4, 3, 0), (5, 3, 0), (6, 3, 0), (7, 3, 0),
+        (8, 3, 0), (9, 3, 0), (10, 3, 0), (11, 3, 0), (12, 3, 0), (13, 3, 0),
+        # Fifth row (main body)
+        (2, 4, 0), (3, 4, 0), (4, 4, 0), (5, 4, 0), (6, 4, 0), (7, 4, 0),
+        (8, 4, 0), (9, 4, 0), (10, 4, 0), (11, 4, 0), (12, 4, 0),
+        # Sixth row
+        (3, 5, 0), (4, 5, 0), (5, 5, 0), (6, 5, 0), (7, 5, 0), (8, 5, 0),
+        (9, 5, 0), (10, 5, 0), (11, 5, 0),
+        # Bottom row
+        (0, 6, 0), (2, 6, 0), (4, 6, 0), (6, 6, 0), (8, 6, 0), (10, 6, 0), (12, 6, 0),
+        (14, 6, 0),
+
+        # === LAYER 1 (Middle) ===
+        (2, 1, 1), (3, 1, 1), (4, 1, 1), (5, 1, 1), (6, 1, 1), (7, 1, 1), (8, 1, 1),
+        (9, 1, 1), (10, 1, 1), (11, 1, 1), (12, 1, 1),
+        (2, 2, 1), (3, 2, 1), (4, 2, 1), (5, 2, 1), (6, 2, 1), (7, 2, 1), (8, 2, 1),
+        (9, 2, 1), (10, 2, 1), (11, 2, 1), (12, 2, 1),
+        (2, 3, 1), (3, 3, 1), (4, 3, 1), (5, 3, 1), (6, 3, 1), (7, 3, 1), (8, 3, 1),
+        (9, 3, 1), (10, 3, 1), (11, 3, 1), (12, 3, 1),
+        (2, 4, 1), (3, 4, 1), (4, 4, 1), (5, 4, 1), (6, 4, 1), (7, 4, 1), (8, 4, 1),
+        (9, 4, 1), (10, 4, 1), (11, 4, 1), (12, 4, 1),
+        (4, 5, 1), (5, 5, 1), (6, 5, 1), (7, 5, 1), (8, 5, 1), (9, 5, 1), (10, 5, 1),
+
+        # === LAYER 2 (Top) ===
+        (6, 2, 2), (7, 2, 2), (6, 3, 2), (7, 3, 2),
+    ]
+
+    return [TilePosition(x, y, z) for x, y, z in layout]
+
+
+def create_dragon_layout() -> List[TilePosition]:
+    """Hard level - Double Pyramid/Diamond layout (~88-92 tiles, 5 layers)"""
+    layout = [
+        # === LAYER 0 (Bottom/Base) ===
+        (6, 0, 0), (7, 0, 0), (8, 0, 0),
+        (4, 1, 0), (5, 1, 0), (6, 1, 0), (7, 1, 0), (8, 1, 0), (9, 1, 0), (10, 1, 0),
+        (2, 2, 0), (3, 2, 0), (4, 2, 0), (5, 2, 0), (6, 2, 0), (7, 2, 0), (8, 2, 0),
+        (9, 2, 0), (10, 2, 0), (11, 2, 0), (12, 2, 0),
+        (1, 3, 0), (2, 3, 0), (3, 3, 0), (4, 3, 0), (5, 3, 0), (6, 3, 0), (7, 3, 0),
+        (8, 3, 0), (9, 3, 0), (10, 3, 0), (11, 3, 0), (12, 3, 0), (13, 3, 0),
+        (0, 4, 0), (1, 4, 0), (2, 4, 0), (3, 4, 0), (4, 4, 0), (5, 4, 0), (6, 4, 0),
+        (7, 4, 0), (8, 4, 0), (9, 4, 0), (10, 4, 0), (11, 4, 0), (12, 4, 0),
+        (13, 4, 0), (14, 4, 0),
+        (1, 5, 0), (2, 5, 0), (3, 5, 0), (4, 5, 0), (5, 5, 0), (6, 5, 0), (7, 5, 0),
+        (8, 5, 0), (9, 5, 0), (10, 5, 0), (11, 5, 0), (12, 5, 0), (13, 5, 0),
+        (2, 6, 0), (3, 6, 0), (4, 6, 0), (5, 6, 0), (6, 6, 0), (7, 6, 0), (8, 6, 0),
+        (9, 6, 0), (10, 6, 0), (11, 6, 0), (12, 6, 0),
+        (4, 7, 0), (5, 7, 0), (6, 7, 0), (7, 7, 0), (8, 7, 0), (9, 7, 0), (10, 7, 0),
+        (6, 8, 0), (7, 8, 0), (8, 8, 0),
+
+        # === LAYER 1 (First Inner Layer) ===
+        (5, 1, 1), (6, 1, 1), (7, 1, 1), (8, 1, 1), (9, 1, 1),
+        (3, 2, 1), (4, 2, 1), (5, 2, 1), (6, 2, 1), (7, 2, 1), (8, 2, 1), (9, 2, 1),
+        (10, 2, 1), (11, 2, 1),
+        (2, 3, 1), (3, 3, 1), (4, 3, 1), (5, 3, 1), (6, 3, 1), (7, 3, 1), (8, 3, 1),
+        (9, 3, 1), (10, 3, 1), (11, 3, 1), (12, 3, 1),
+        (2, 4, 1), (3, 4, 1), (4, 4, 1), (5, 4, 1), (6, 4, 1), (7, 4, 1), (8, 4, 1),
+        (9, 4, 1), (10, 4, 1), (11, 4, 1), (12, 4, 1),
+        (2, 5, 1), (3, 5, 1), (4, 5, 1), (5, 5, 1), (6, 5, 1), (7, 5, 1), (8, 5, 1),
+        (9, 5, 1), (10, 5, 1), (11, 5, 1), (12, 5, 1),
+        (3, 6, 1), (4, 6, 1), (5, 6, 1), (6, 6, 1), (7, 6, 1), (8, 6, 1), (9, 6, 1),
+        (10, 6, 1), (11, 6, 1),
+        (5, 7, 1), (6, 7, 1), (7, 7, 1), (8, 7, 1), (9, 7, 1),
+
+        # === LAYER 2 (Second Inner Layer) ===
+        (4, 2, 2), (5, 2, 2), (6, 2, 2), (7, 2, 2), (8, 2, 2), (9, 2, 2), (10, 2, 2),
+        (4, 3, 2), (5, 3, 2), (6, 3, 2), (7, 3, 2), (8, 3, 2), (9, 3, 2), (10, 3, 2),
+        (4, 4, 2), (5, 4, 2), (6, 4, 2), (7, 4, 2), (8, 4, 2), (9, 4, 2), (10, 4, 2),
+        (4, 5, 2), (5, 5, 2), (6, 5, 2), (7, 5, 2), (8, 5, 2), (9, 5, 2), (10, 5, 2),
+        (4, 6, 2), (5, 6, 2), (6, 6, 2), (7, 6, 2), (8, 6, 2), (9, 6, 2), (10, 6, 2),
+
+        # === LAYER 3 (Pre-Peak Layer) ===
+        (5, 3, 3), (6, 3, 3), (7, 3, 3), (8, 3, 3), (9, 3, 3),
+        (5, 4, 3), (6, 4, 3), (7, 4, 3), (8, 4, 3), (9, 4, 3),
+        (5, 5, 3), (6, 5, 3), (7, 5, 3), (8, 5, 3), (9, 5, 3),
+
+        # === LAYER 4 (Twin Peaks) ===
+        (5, 3, 4), (5, 4, 4),
+        (9, 3, 4), (9, 4, 4),
+    ]
+
+    return [TilePosition(x, y, z) for x, y, z in layout]
+
+
+# Shipped layouts, in level order
+LAYOUTS = {
+    "Turtle": create_pyramid_layout,
+    "Temple": create_temple_layout,
+    "Diamond Peaks": create_dragon_layout,
+}
+
+
+def balanced_character_ids(num_pairs: int, num_characters: int = NUM_CHARACTERS) -> List[int]:
+    """One character ID per pair, with every character used as evenly as possible"""
+    # Every character gets the same number of pairs, the remainder goes to the lowest IDs
+    pairs_per_character = num_pairs // num_characters
+    remainder = num_pairs % num_characters
+
+    character_ids = []
+    for char_id in range(num_characters):
+        character_ids.extend([char_id] * pairs_per_character)
+    character_ids.extend(range(remainder))
+    return character_ids
+
+
+# Sides a blocker can sit on, as stored in LayoutGraph.blocks
+LEFT = 0
+RIGHT = 1
+TOP = 2
+
+
+class LayoutGraph:
+    """Blocker/dependency graph for a layout, compiled once per layout.
+
+    Positions are numbered in layout order. ``left[i]``, ``right[i]`` and
+    ``top[i]`` hold the indices that block position ``i`` on that side;
+    ``blocks[i]`` is the reverse edge list of ``(dependent, side)`` pairs, i.e.
+    the tiles whose free status can change when ``i`` is removed or restored.
+    ``covered_by[i]`` is every position stacked (transitively) on top of ``i``:
+    all of them must be gone before ``i`` can ever be free.
+    """
+
+    def __init__(self, positions: Iterable[TilePosition]):
+        positions = list(positions)
+        # We need pairs, so ensure even number of positions
+        if len(positions) % 2 != 0:
+            positions = positions[:-1]
+        self.positions: List[TilePosition] = positions
+        self.index: Dict[TilePosition, int] = {pos: i for i, pos in enumerate(self.positions)}
+        count = len(self.positions)
+        self.left: List[Tuple[int, ...]] = []
+        self.right: List[Tuple[int, ...]] = []
+        self.top: List[Tuple[int, ...]] = []
+        blocks: List[List[Tuple[int, int]]] = [[] for _ in range(count)]
+
+        for i, pos in enumerate(self.positions):
+            # A tile at this layer directly to the left / right, or directly on top
+            sides = (
+                self._lookup(TilePosition(pos.x - 1, pos.y, pos.z)),
+                self._lookup(TilePosition(pos.x + 1, pos.y, pos.z)),
+                self._lookup(TilePosition(pos.x, pos.y, pos.z + 1)),
+            )
+            for side, blockers in enumerate(sides):
+                for blocker in blockers:
+                    blocks[blocker].append((i, side))
+            self.left.append(sides[LEFT])
+            self.right.append(sides[RIGHT])
+            self.top.append(sides[TOP])
+
+        self.blocks: List[Tuple[Tuple[int, int], ...]] = [tuple(edges) for edges in blocks]
+
+        # Walk layers top-down so each tile's cover is complete before the tile below needs it
+        covered_by: List[frozenset] = [frozenset()] * count
+        for i in sorted(range(count), key=lambda k: -self.positions[k].z):
+            cover = set()
+            for above in self.top[i]:
+                cover.add(above)
+                cover |= covered_by[above]
+            covered_by[i] = frozenset(cover)
+        self.covered_by: List[frozenset] = covered_by
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _lookup(self, pos: TilePosition) -> Tuple[int, ...]:
+        i = self.index.get(pos)
+        return () if i is None else (i,)
+
+
+class Board:
+    """Tile identities and removal state for one layout.
+
+    Tiles are addressed by their :class:`TilePosition`. A board starts with
+    every position present; :meth:`match` removes a pair and :meth:`undo`
+    puts the last removed pair back.
+
+    Free status is tracked incrementally: each position keeps a count of the
+    blockers still present on each side, so removing or restoring a tile only
+    touches the tiles it blocks in the :class:`LayoutGraph`. Free tiles are
+    also bucketed by character, which makes move counting and hints O(characters).
+    """
+
+    def __init__(self, positions: Iterable[TilePosition], num_characters: int = NUM_CHARACTERS,
+                 graph: Optional[LayoutGraph] = None):
+        self.graph = graph if graph is not None else LayoutGraph(positions)
+        self.positions: List[TilePosition] = self.graph.positions
+        self.num_characters = num_characters
+        self.tile_characters: List[int] = [0] * len(self.positions)
+        self.history: List[Move] = []
+        self._reset_state()
+
+    @classmethod
+    def from_characters(cls, characters: Dict[TilePosition, int],
+                        num_characters: int = NUM_CHARACTERS) -> "Board":
+        """Build a board from an already dealt position -> character ID mapping"""
+        board = cls(characters.keys(), num_characters)
+        board.tile_characters = [characters[pos] for pos in board.positions]
+        board._reset_state()
+        return board
+
+    def _reset_state(self):
+        """Mark every position present and compute free status from scratch"""
+        graph = self.graph
+        count = len(graph)
+        self.present: List[bool] = [True] * count
+        self.remaining = count
+        self.blocker_counts: List[List[int]] = [
+            [len(graph.left[i]) for i in range(count)],
+            [len(graph.right[i]) for i in range(count)],
+            [len(graph.top[i]) for i in range(count)],
+        ]
+        self.free: set = set()
+        num_buckets = max([self.num_characters] + [char_id + 1 for char_id in self.tile_characters])
+        self.free_by_character: List[set] = [set() for _ in range(num_buckets)]
+        self.remaining_by_character: List[int] = [0] * num_buckets
+        for char_id in self.tile_characters:
+            self.remaining_by_character[char_id] += 1
+        for i in range(count):
+            self._refresh(i)
+
+    def deal(self, rng: Optional[random.Random] = None, solvable: bool = True) -> Dict[TilePosition, int]:
+        """Assign a balanced, shuffled character ID to every position.
+
+        With ``solvable`` the deal is built by playing the layout backwards
+        (see :meth:`_deal_backwards`), so at least one winning line exists.
+        """
+        rng = rng or random
+        pair_ids = balanced_character_ids(len(self.positions) // 2, self.num_characters)
+        rng.shuffle(pair_ids)
+
+        self._reset_state()
+        dealt = self._deal_backwards(pair_ids, rng) if solvable else None
+        if dealt is not None:
+            character_ids = [dealt[i] for i in range(len(self.positions))]
+        else:
+            # Duplicate for pairs (each character appears twice per pair)
+            character_ids = pair_ids * 2
+            rng.shuffle(character_ids)
+
+        self.tile_characters = character_ids
+        self.history = []
+        self._reset_state()
+        return self.characters
+
+    def _deal_backwards(self, pair_ids: List[int], rng) -> Optional[Dict[int, int]]:
+        """Deal the present tiles by removing random pairs of free tiles.
+
+        Each removed pair gets the next ID from ``pair_ids``. The removal
+        order itself is a winning line, because both tiles of every pair were
+        free at the moment they were taken; reversed, it is not (its first
+        pair is usually buried on the full board). Returns index -> ID, or
+        ``None`` if every attempt ends with a lone free tile and no partner to
+        pair it with. The board is left exactly as it was found.
+        """
+        for _ in range(SOLVABLE_DEAL_ATTEMPTS):
+            dealt: Dict[int, int] = {}
+            removed: List[Tuple[int, int]] = []
+            for char_id in pair_ids:
+                if len(self.free) < 2:
+                    break
+                i, j = rng.sample(sorted(self.free), 2)
+                dealt[i] = dealt[j] = char_id
+                self.remove_pair(i, j)
+                removed.append((i, j))
+            for i, j in reversed(removed):
+                self.restore_pair(i, j)
+            if len(removed) == len(pair_ids):
+                return dealt
+        return None
+
+    @property
+    def characters(self) -> Dict[TilePosition, int]:
+        """Position -> character ID for every position, removed or not"""
+        return dict(zip(self.positions, self.tile_characters))
+
+    def __len__(self) -> int:
+        return self.remaining
+
+    def __contains__(self, pos: TilePosition) -> bool:
+        i = self.graph.index.get(pos)
+        return i is not None and self.present[i]
+
+    @property
+    def is_cleared(self) -> bool:
+        return self.remaining == 0
+
+    def character_at(self, pos: TilePosition) -> int:
+        return self.tile_characters[self.graph.index[pos]]
+
+    def _refresh(self, i: int):
+        """Recompute the free status of one position from its blocker counts"""
+        counts = self.blocker_counts
+        if (self.present[i] and counts[TOP][i] == 0
+                and (counts[LEFT][i] == 0 or counts[RIGHT][i] == 0)):
+            self.free.add(i)
+            self.free_by_character[self.tile_characters[i]].add(i)
+        else:
+            self.free.discard(i)
+            self.free_by_character[self.tile_characters[i]].discard(i)
+
+    def copy(self) -> "Board":
+        """Independent board sharing this board's compiled graph"""
+        board = Board.__new__(Board)
+        board.graph = self.graph
+        board.positions = self.positions
+        board.num_characters = self.num_characters
+        board.tile_characters = list(self.tile_characters)
+        board.history = list(self.history)
+        board.present = list(self.present)
+        board.remaining = self.remaining
+        board.blocker_counts = [list(counts) for counts in self.blocker_counts]
+        board.free = set(self.free)
+        board.free_by_character = [set(bucket) for bucket in self.free_by_character]
+        board.remaining_by_character = list(self.remaining_by_character)
+        return board
+
+    def remove_pair(self, i: int, j: int):
+        """Remove two tiles by index, without validation or history (for search code)"""
+        self._remove(i)
+        self._remove(j)
+
+    def restore_pair(self, i: int, j: int):
+        """Inverse of :meth:`remove_pair`"""
+        self._restore(j)
+        self._restore(i)
+
+    def _remove(self, i: int):
+        self.present[i] = False
+        self.remaining -= 1
+        self.remaining_by_character[self.tile_characters[i]] -= 1
+        self.free.discard(i)
+        self.free_by_character[self.tile_characters[i]].discard(i)
+        counts = self.blocker_counts
+        for dependent, side in self.graph.blocks[i]:
+            counts[side][dependent] -= 1
+            self._refresh(dependent)
+
+    def _restore(self, i: int):
+        self.present[i] = True
+        self.remaining += 1
+        self.remaining_by_character[self.tile_characters[i]] += 1
+        counts = self.blocker_counts
+        for dependent, side in self.graph.blocks[i]:
+            counts[side][dependent] += 1
+            self._refresh(dependent)
+        self._refresh(i)
+
+    def is_blocked_left(self, pos: TilePosition) -> bool:
+        """Check if tile is blocked on the left - adjacent tile on same layer"""
+        return self.blocker_counts[LEFT][self.graph.index[pos]] > 0
+
+    def is_blocked_right(self, pos: TilePosition) -> bool:
+        """Check if tile is blocked on the right - adjacent tile on same layer"""
+        return self.blocker_counts[RIGHT][self.graph.index[pos]] > 0
+
+    def is_blocked_top(self, pos: TilePosition) -> bool:
+        """Check if tile has another tile on top covering it"""
+        return self.blocker_counts[TOP][self.graph.index[pos]] > 0
+
+    def is_free(self, pos: TilePosition) -> bool:
+        """Check if tile can be selected - must not be covered AND must be free on at least one side"""
+        i = self.graph.index.get(pos)
+        return i is not None and i in self.free
+
+    def free_positions(self) -> List[TilePosition]:
+        """All selectable tiles, in layout order"""
+        return [self.positions[i] for i in sorted(self.free)]
+
+    def is_match(self, a: TilePosition, b: TilePosition) -> bool:
+        """Check if two tiles can be removed together right now"""
+        return (a != b and self.is_free(a) and self.is_free(b)
+                and self.character_at(a) == self.character_at(b))
+
+    def match(self, a: TilePosition, b: TilePosition):
+        """Remove a matching pair of free tiles"""
+        if not self.is_match(a, b):
+            raise ValueError(f"Not a legal match: {a} and {b}")
+        self._remove(self.graph.index[a])
+        self._remove(self.graph.index[b])
+        self.history.append((a, b))
+
+    def undo(self) -> Optional[Move]:
+        """Put the last matched pair back and return it"""
+        if not self.history:
+            return None
+        a, b = self.history.pop()
+        self._restore(self.graph.index[b])
+        self._restore(self.graph.index[a])
+        return a, b
+
+    def count_moves(self) -> int:
+        """Count available matching pairs - C(k, 2) summed over the free tiles of each character"""
+        return sum(len(bucket) * (len(bucket) - 1) // 2 for bucket in self.free_by_character)
+
+    def find_match(self) -> Optional[Move]:
+        """Return an available matching pair, if any"""
+        for bucket in self.free_by_character:
+            if len(bucket) >= 2:
+                i, j = sorted(bucket)[:2]
+                return self.positions[i], self.positions[j]
+        return None
+
+    def shuffle(self, rng: Optional[random.Random] = None, solvable: bool = True):
+        """Reassign the character IDs of the remaining tiles.
+
+        With ``solvable`` the remaining tiles are re-dealt backwards from the
+        current position, so the mixed board can always still be cleared.
+        Falls back to a plain random shuffle if that fails.
+        """
+        rng = rng or random
+        remaining = [i for i, present in enumerate(self.present) if present]
+        pair_ids = [char_id for char_id, count in enumerate(self.remaining_by_character)
+                    for _ in range(count // 2)]
+        rng.shuffle(pair_ids)
+
+        dealt = None
+        if solvable and len(pair_ids) * 2 == len(remaining):
+            dealt = self._deal_backwards(pair_ids, rng)
+        if dealt is not None:
+            character_ids = [dealt[i] for i in remaining]
+        else:
+            character_ids = [self.tile_characters[i] for i in remaining]
+            rng.shuffle(character_ids)
+        for i, char_id in zip(remaining, character_ids):
+            self.tile_characters[i] = char_id
+        for bucket in self.free_by_character:
+            bucket.clear()
+        for i in self.free:
+            self.free_by_character[self.tile_characters[i]].add(i)
@@ -1,23 +1,39 @@
 import pygame
+import bisect
 import math
-import random
 import os
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 try:
     from PIL import Image
 except Exception:
     Image = None
-
-# Initialize Pygame
-pygame.mixer.pre_init(44100, -16, 2, 512)
-pygame.init()
 try:
-    pygame.mixer.init()
-except Exception as e:
-    print(f"Audio init failed: {e}")
+    import numpy as np
+except Exception:
+    np = None
+
+from mahjong_engine import (
+    Board,
+    LayoutGraph,
+    TilePosition,
+    create_dragon_layout,
+    create_pyramid_layout,
+    create_temple_layout,
+)
+from mahjong_solver import HintEngine
+
+
+def init_pygame():
+    """Initialize pygame and the mixer (only needed by the windowed client)"""
+    pygame.mixer.pre_init(44100, -16, 2, 512)
+    pygame.init()
+    try:
+        pygame.mixer.init()
+    except Exception as e:
+        print(f"Audio init failed: {e}")
 
 # Constants
 WINDOW_WIDTH = 1400
@@ -39,7 +55,15 @@ LAYER_OFFSET_X = 6
 LAYER_OFFSET_Y = 5
 TILE_DEPTH = 8  # 3D effect depth
 FPS = 60
+IDLE_SLEEP = True  # Sleep until input while nothing on screen moves, instead of drawing at FPS
+IDLE_WAIT_MS = 1000  # Longest such sleep
 MATCH_REVEAL_DELAY = 500  # ms
+SOLVER_FRAME_BUDGET_MS = 4  # Background solver time per frame
+TEXT_CACHE_SIZE = 256  # Rendered text surfaces kept across frames
+BACKGROUND_CACHE_SIZE = 64  # Scaled button/panel backgrounds kept across frames
+SPRITE_CACHE_SIZE = 512  # Composited tile sprites kept across frames
+FLIP_FRAMES = 16  # Pre-scaled widths per tile image for the flip animation
+BUTTON_SCALE_STEP = 0.01  # Hover scale is drawn rounded to this, to bound background sizes
 
 # Colors - Modern mobile game palette
 BG_GRADIENT_TOP = (20, 30, 60)
@@ -66,23 +90,286 @@ PLAYING = 2
 LEVEL_COMPLETE = 3
 GAME_OVER = 4
 
-@dataclass
-class TilePosition:
-    x: int  # Grid X
-    y: int  # Grid Y
-    z: int  # Layer (height)
-    
-    def __hash__(self):
-        return hash((self.x, self.y, self.z))
+def screen_position(pos: TilePosition, offset_x: int, offset_y: int) -> Tuple[int, int]:
+    """Top-left screen position of a tile with 3D offset"""
+    # Space based on the actual visible domino so tiles touch cleanly
+    base_x = int(offset_x + pos.x * GRID_STEP_X)
+    base_y = int(offset_y + pos.y * GRID_STEP_Y)
     
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y and self.z == other.z
+    # 3D depth effect - offset to the RIGHT and UP for stacked tiles
+    depth_offset_x = pos.z * LAYER_OFFSET_X
+    depth_offset_y = pos.z * LAYER_OFFSET_Y
+    return int(base_x - depth_offset_x), int(base_y - depth_offset_y)
+
+
+def render_text(font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+                alpha: Optional[int] = None) -> pygame.Surface:
+    """Render antialiased text, optionally with a surface alpha"""
+    surface = font.render(text, True, color)
+    if alpha is not None:
+        surface.set_alpha(alpha)
+    return surface
+
+
+def render_gradient(size: Tuple[int, int], top: Tuple[int, int, int],
+                    bottom: Tuple[int, int, int]) -> pygame.Surface:
+    """A vertical gradient from ``top`` to ``bottom``, one colour per row"""
+    width, height = max(size[0], 1), max(size[1], 1)
+    # Colour a one pixel wide column, then stretch it sideways
+    column = pygame.Surface((1, height))
+    if np is not None:
+        # Same arithmetic as the per-row loop, done for every row at once
+        ratio = np.arange(height) / height
+        rows = (np.array(top) + (np.array(bottom) - np.array(top)) * ratio[:, None]).astype(int)
+        pygame.surfarray.blit_array(column, rows[None])
+    else:
+        for y in range(height):
+            ratio = y / height
+            column.set_at((0, y), tuple(int(top[i] + (bottom[i] - top[i]) * ratio) for i in range(3)))
+    return pygame.transform.scale(column, (width, height))
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces keyed by (font, text, colour, alpha).
+
+    Cached surfaces are shared, so callers must not draw on them or change
+    their alpha.
+    """
+
+    def __init__(self, max_size: int = TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+               alpha: Optional[int] = None) -> pygame.Surface:
+        """Rendered text, rasterised only the first time it is asked for"""
+        key = (font, text, color, alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = render_text(font, text, color, alpha)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+class BackgroundCache:
+    """Size-keyed LRU of scaled UI backgrounds, optionally with a glow baked in.
+
+    Misses are scaled from the smallest halving of the source that is still at
+    least twice the target size, which is much cheaper than scaling the
+    full-resolution art and looks the same.
+    """
+
+    def __init__(self, max_size: int = BACKGROUND_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.mipmaps = {}  # Source -> [source, half size, quarter size, ...]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: pygame.Surface, size: Tuple[int, int],
+            glow: Optional[Tuple[int, int, int, int]] = None) -> pygame.Surface:
+        """``source`` scaled to ``size``, with ``glow`` added on top if given"""
+        key = (source, size, glow)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = pygame.transform.smoothscale(self._level_for(source, size), size)
+        if glow:
+            surface.fill(glow, special_flags=pygame.BLEND_RGBA_ADD)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def _level_for(self, source: pygame.Surface, size: Tuple[int, int]) -> pygame.Surface:
+        """Smallest halving of the source that is still at least twice ``size``"""
+        levels = self.mipmaps.get(source)
+        if levels is None:
+            levels = [source]
+            while min(levels[-1].get_size()) >= 128:
+                width, height = levels[-1].get_size()
+                levels.append(pygame.transform.smoothscale(levels[-1], (width // 2, height // 2)))
+            self.mipmaps[source] = levels
+        best = source
+        for level in levels:
+            if level.get_width() < size[0] * 2 or level.get_height() < size[1] * 2:
+                break
+            best = level
+        return best
+
+
+class DominoMask:
+    """Mask, mask surface and outline of one domino image, shared by every tile showing it"""
+
+    def __init__(self, image: pygame.Surface):
+        self.mask = pygame.mask.from_surface(image)
+        self.surface = self.mask.to_surface(
+            setcolor=(255, 255, 255, 255),
+            unsetcolor=(0, 0, 0, 0)
+        )
+        self.outline = self.mask.outline()
+
+
+class TileSprites:
+    """Pre-composited tile sprites, built once per look and reused every frame.
+
+    A sprite holds the hover glow, depth shadow, face, blocked shade, stacked
+    highlight and selection/hint border in one premultiplied surface, so a
+    tile is drawn with a single blit. Flipping tiles use the ``UNDER`` and
+    ``OVER`` halves around their scaled face instead.
+    """
+
+    FULL = 0
+    UNDER = 1  # Glow and shadow only
+    OVER = 2  # Shade, highlight and border only
+
+    def __init__(self, face_down_image: Optional[pygame.Surface] = None, images: List[pygame.Surface] = (),
+                 max_size: int = SPRITE_CACHE_SIZE):
+        self.face_down_image = face_down_image
+        self.max_size = max_size
+        self.sprites: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()  # Bounded LRU, see get()
+        self.flip_strips = {}  # Image -> FLIP_FRAMES + 1 widths, from a 1 px sliver to full size
+        for image in list(images) + [face_down_image]:
+            if image is not None:
+                self.flip_strips[image] = self._flip_strip(image)
+
+    @staticmethod
+    def _flip_strip(image: pygame.Surface) -> List[pygame.Surface]:
+        width, height = image.get_size()
+        strip = []
+        for step in range(FLIP_FRAMES):
+            strip.append(pygame.transform.smoothscale(image, (max(1, width * step // FLIP_FRAMES), height)))
+        strip.append(image)
+        return strip
+
+    def flip_frame(self, image: pygame.Surface, scale_x: float) -> pygame.Surface:
+        """The image squeezed horizontally to the nearest pre-scaled width"""
+        strip = self.flip_strips.get(image)
+        if strip is None:
+            strip = self.flip_strips[image] = self._flip_strip(image)
+        return strip[round(scale_x * FLIP_FRAMES)]
+
+    def get(self, tile: "Tile", shadow_alpha: int, is_free: bool, is_hovered: bool,
+            part: int = FULL) -> pygame.Surface:
+        """Sprite for the tile's current look, composited on first use.
+
+        Each part is keyed only on what it draws, so the halves used while
+        flipping are shared by tiles whose faces or borders differ.
+        """
+        if tile.is_selected:
+            border = (255, 215, 0, 220)
+        elif tile.is_hint:
+            border = (50, 255, 100, 220)
+        else:
+            border = None
+        face_up = tile.face_up or self.face_down_image is None
+        glow = is_hovered and is_free
+        stacked = tile.pos.z > 0
+        if part == self.UNDER:
+            key = (part, tile.character_id, shadow_alpha, glow)
+        elif part == self.OVER:
+            key = (part, tile.character_id, is_free, border, stacked)
+        else:
+            key = (part, tile.character_id, shadow_alpha, is_free, glow, border, face_up, stacked)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        face = tile.image if face_up else self.face_down_image
+        sprite = self._compose(tile, face, shadow_alpha, is_free, glow, border, stacked, part)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def _compose(self, tile: "Tile", face: pygame.Surface, shadow_alpha: int, is_free: bool,
+                 glow: bool, border: Optional[Tuple[int, int, int, int]], stacked: bool,
+                 part: int) -> pygame.Surface:
+        """Stack the tile's layers in draw order, offset by one pixel for the highlight"""
+        width, height = tile.image.get_size()
+        sprite = pygame.Surface((width + 2, height + 3), pygame.SRCALPHA)
+        sprite.fill((0, 0, 0, 0))
+
+        def masked(color: Tuple[int, int, int, int]) -> pygame.Surface:
+            layer = pygame.Surface((width, height), pygame.SRCALPHA)
+            layer.fill(color)
+            layer.blit(tile.mask_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            return layer
+
+        def outline(color: Tuple[int, int, int, int], widths) -> pygame.Surface:
+            layer = pygame.Surface((width, height), pygame.SRCALPHA)
+            for line_width, alpha in widths:
+                pygame.draw.lines(layer, color[:3] + (alpha,), True, tile.mask_outline, line_width)
+            return layer
+
+        layers = []
+        if part != self.OVER:
+            if glow and tile.mask_outline:
+                layers.append((outline((50, 255, 100, 0), [(8, 40), (6, 70), (4, 110)]), (0, 1)))
+            if tile.mask_surface:
+                layers.append((masked((0, 0, 0, shadow_alpha)), (2, 3)))
+        if part == self.FULL:
+            layers.append((face, (0, 1)))
+        if part != self.UNDER:
+            if not is_free and tile.mask_surface:
+                layers.append((masked((0, 0, 0, 70)), (0, 1)))
+            if stacked and tile.mask_outline:
+                layers.append((outline((255, 255, 255, 0), [(2, 90)]), (0, 0)))
+            if border and tile.mask_outline:
+                layers.append((outline(border, [(4, border[3])]), (0, 1)))
+        for layer, offset in layers:
+            sprite.blit(layer.premul_alpha(), offset, special_flags=pygame.BLEND_PREMULTIPLIED)
+        return sprite
+
+
+class Animator:
+    """The animations in progress, all advanced once per frame from a single clock.
+
+    Each one is an update callback keyed by its owner and kind; it is given
+    the frame time in ms and returns whether it needs further frames. Tiles
+    and buttons that are at rest are never visited.
+    """
+
+    def __init__(self):
+        self.now = pygame.time.get_ticks()  # Frame time in ms, shared by everything started or drawn this frame
+        self.active = {}  # (owner, kind) -> update(now), True while it still runs
+        self.running = set()  # Owners still animating after the last tick
+
+    def start(self, owner, kind: str, update):
+        """Run update every frame until it reports it is done, replacing the owner's previous one"""
+        self.active[(owner, kind)] = update
+
+    def stop(self, owner, kind: str):
+        """Drop an animation without running it again"""
+        self.active.pop((owner, kind), None)
+
+    def tick(self) -> set:
+        """Advance every active animation to the current time; returns the owners still animating"""
+        self.now = pygame.time.get_ticks()
+        for key, update in list(self.active.items()):
+            if not update(self.now) and self.active.get(key) == update:
+                del self.active[key]
+        self.running = {owner for owner, _ in self.active}
+        return self.running
 
 class Tile:
-    def __init__(self, pos: TilePosition, character_id: int, image: pygame.Surface):
+    def __init__(self, pos: TilePosition, character_id: int, image: pygame.Surface,
+                 shape: Optional[DominoMask] = None):
         self.pos = pos
+        self.draw_key = (pos.z, pos.y + pos.x, pos.y, pos.x)  # Back to front, top-right to bottom-left
         self.character_id = character_id
-        self.image = image
+        self.image = None
         self.mask = None
         self.mask_surface = None
         self.mask_outline = []
@@ -100,24 +387,25 @@ class Tile:
         self.animation_offset = 0
         self.shake_offset_x = 0
         self.shake_time = 0
-        self.refresh_mask()
+        self.set_image(image, shape)
 
-    def refresh_mask(self):
-        """Rebuild mask data after image changes."""
-        if not self.image:
+    def set_image(self, image: pygame.Surface, shape: Optional[DominoMask] = None):
+        """Show a new image, sharing its precomputed mask data when given."""
+        self.image = image
+        if not image:
             self.mask = None
             self.mask_surface = None
             self.mask_outline = []
             return
-        self.mask = pygame.mask.from_surface(self.image)
-        self.mask_surface = self.mask.to_surface(
-            setcolor=(255, 255, 255, 255),
-            unsetcolor=(0, 0, 0, 0)
-        )
-        self.mask_outline = self.mask.outline()
+        if shape is None:
+            shape = DominoMask(image)
+        self.mask = shape.mask
+        self.mask_surface = shape.surface
+        self.mask_outline = shape.outline
 
-    def set_face_state(self, face_up: bool, animate: bool = True):
-        if not animate:
+    def set_face_state(self, face_up: bool, animator: Optional[Animator] = None):
+        """Turn the tile over, flipping it across a few frames when an animator is given"""
+        if animator is None:
             self.face_up = face_up
             self.flip_active = False
             self.flip_progress = 1.0
@@ -126,20 +414,23 @@ class Tile:
             return
         self.flip_from_up = self.face_up
         self.flip_to_up = face_up
-        self.flip_start = pygame.time.get_ticks()
+        self.flip_start = animator.now
         self.flip_active = True
         self.flip_progress = 0.0
+        animator.start(self, "flip", self.update_flip)
 
-    def update_flip(self):
+    def update_flip(self, now: int) -> bool:
+        """Advance the flip; False once it has finished"""
         if not self.flip_active:
-            return
-        elapsed = pygame.time.get_ticks() - self.flip_start
+            return False
+        elapsed = now - self.flip_start
         progress = min(1.0, elapsed / self.flip_duration)
         if progress >= 0.5 and self.face_up == self.flip_from_up:
             self.face_up = self.flip_to_up
         self.flip_progress = progress
         if progress >= 1.0:
             self.flip_active = False
+        return self.flip_active
 
     def has_adjacent_stack(self, tiles_dict: dict) -> bool:
         """Check if any neighboring tile is on a higher layer."""
@@ -152,73 +443,15 @@ class Tile:
                     return True
         return False
         
-    def get_screen_pos(self, offset_x: int, offset_y: int) -> Tuple[int, int]:
-        """Calculate screen position with 3D offset"""
-        # Space based on the actual visible domino so tiles touch cleanly
-        spacing_x = GRID_STEP_X
-        spacing_y = GRID_STEP_Y
-        
-        base_x = int(offset_x + self.pos.x * spacing_x)
-        base_y = int(offset_y + self.pos.y * spacing_y)
-        
-        # 3D depth effect - offset to the RIGHT and UP for stacked tiles
-        depth_offset_x = self.pos.z * LAYER_OFFSET_X
-        depth_offset_y = self.pos.z * LAYER_OFFSET_Y
-        
-        self.render_x = int(base_x - depth_offset_x)
-        self.render_y = int(base_y - depth_offset_y)
-        
-        return self.render_x, self.render_y
-    
-    def is_blocked_left(self, tiles_dict: dict) -> bool:
-        """Check if tile is blocked on the left - adjacent tile on same layer"""
-        # A tile at this layer directly to the left
-        left_pos = TilePosition(self.pos.x - 1, self.pos.y, self.pos.z)
-        if left_pos in tiles_dict:
-            return True
-        return False
-    
-    def is_blocked_right(self, tiles_dict: dict) -> bool:
-        """Check if tile is blocked on the right - adjacent tile on same layer"""
-        # A tile at this layer directly to the right
-        right_pos = TilePosition(self.pos.x + 1, self.pos.y, self.pos.z)
-        if right_pos in tiles_dict:
-            return True
-        return False
-    
-    def is_blocked_top(self, tiles_dict: dict) -> bool:
-        """Check if tile has another tile on top covering it"""
-        # Check if any tile one layer above overlaps with this tile's area
-        # A tile above must overlap to cover - check a 3x3 grid around our position
-        top_pos = TilePosition(self.pos.x, self.pos.y, self.pos.z + 1)
-        if top_pos in tiles_dict:
-            return True
-        return False
-    
-    def is_free(self, tiles_dict: dict) -> bool:
-        """Check if tile can be selected - must not be covered AND must be free on at least one side"""
-        # Rule 1: Cannot be covered by another tile
-        if self.is_blocked_top(tiles_dict):
-            return False
-        
-        # Rule 2: Must be free on at least one side (left OR right, not both blocked)
-        left_blocked = self.is_blocked_left(tiles_dict)
-        right_blocked = self.is_blocked_right(tiles_dict)
-        
-        # Free if at least one side is open
-        if left_blocked and right_blocked:
-            return False
-        
-        return True
-    
-    def shake(self):
+    def shake(self, animator: Animator):
         """Trigger a shake animation for unavailable tile"""
-        self.shake_time = pygame.time.get_ticks()
+        self.shake_time = max(1, animator.now)
+        animator.start(self, "shake", self.update_shake)
     
-    def update_shake(self):
-        """Update shake animation"""
+    def update_shake(self, now: int) -> bool:
+        """Update shake animation; False once it has settled"""
         if self.shake_time > 0:
-            elapsed = pygame.time.get_ticks() - self.shake_time
+            elapsed = now - self.shake_time
             if elapsed < 300:  # Shake for 300ms
                 # Create shake effect - oscillate back and forth
                 progress = elapsed / 300.0
@@ -226,82 +459,54 @@ class Tile:
             else:
                 self.shake_offset_x = 0
                 self.shake_time = 0
+        return self.shake_time > 0
     
-    def draw(self, screen: pygame.Surface, tiles_dict: dict = None, is_hovered: bool = False, max_z: int = 0,
-             face_down_image: pygame.Surface = None):
-        """Draw the domino tile - just the image"""
-        self.update_shake()
-        self.update_flip()
+    def sprite_state(self, board: Optional[Board], is_hovered: bool, max_z: int) -> Tuple[int, bool, bool]:
+        """Shadow alpha, free and hovered flags that pick this tile's sprite"""
+        # Check if tile is free (clickable)
+        is_free = board is None or board.is_free(self.pos)
+        
+        # Lower tiles get a bit more shadow to separate layers visually
+        depth_factor = max(0, max_z - self.pos.z)
+        shadow_alpha = 40 + min(depth_factor * 12, 80)
+        return shadow_alpha, is_free, is_hovered and is_free
+
+    def look(self, board: Optional[Board], is_hovered: bool, max_z: int) -> tuple:
+        """Everything that decides how a resting tile is drawn"""
+        return (self.render_x, self.render_y, self.character_id, self.face_up,
+                self.is_selected, self.is_hint) + self.sprite_state(board, is_hovered, max_z)
+
+    def bounds(self) -> pygame.Rect:
+        """Screen area the tile's sprite covers at its current position"""
+        width, height = self.image.get_size() if self.image else (TILE_WIDTH, TILE_HEIGHT)
+        return pygame.Rect(self.render_x + self.shake_offset_x, self.render_y + self.animation_offset - 1,
+                           width + 2, height + 3)
+
+    def draw(self, screen: pygame.Surface, sprites: TileSprites, board: Optional[Board] = None,
+             is_hovered: bool = False, max_z: int = 0):
+        """Draw the domino tile from its cached sprite"""
+        if not self.image:
+            return
         
         x, y = self.render_x + self.shake_offset_x, self.render_y
         y += self.animation_offset
-        
-        # Check if tile is free (clickable)
-        is_free = tiles_dict is None or self.is_free(tiles_dict)
-        
-        # Actual domino dimensions (accounting for transparent padding)
-        domino_width = DOMINO_WIDTH
-        domino_height = DOMINO_HEIGHT
-        domino_x = x + DOMINO_INSET_X
-        domino_y = y + DOMINO_INSET_Y
-        
-        # Draw green glow for hovered usable tiles - mask to domino shape
-        if is_hovered and is_free and self.mask_outline:
-            glow_surf = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-            for width, alpha in [(8, 40), (6, 70), (4, 110)]:
-                pygame.draw.lines(glow_surf, (50, 255, 100, alpha), True, self.mask_outline, width)
-            screen.blit(glow_surf, (x, y))
-        
-        # Draw the domino image directly - NO greyscale, always full color
-        if self.image:
-            # Shadows for depth readability (masked to the domino shape)
-            if self.mask_surface:
-                # Lower tiles get a bit more shadow to separate layers visually
-                depth_factor = max(0, max_z - self.pos.z)
-                base_alpha = 40
-                extra_alpha = min(depth_factor * 12, 80)
-                shadow_alpha = base_alpha + extra_alpha
-                shadow = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                shadow.fill((0, 0, 0, shadow_alpha))
-                shadow.blit(self.mask_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-                screen.blit(shadow, (x + 2, y + 2))
-
-            image_to_draw = self.image if self.face_up or face_down_image is None else face_down_image
-            if self.flip_active:
-                # Flip animation (scale X to 0 then back)
-                scale_x = abs(1.0 - (self.flip_progress * 2.0))
-                draw_w = max(1, int(TILE_WIDTH * scale_x))
-                draw_h = TILE_HEIGHT
-                scaled = pygame.transform.smoothscale(image_to_draw, (draw_w, draw_h))
-                draw_x = x + (TILE_WIDTH - draw_w) // 2
-                screen.blit(scaled, (draw_x, y))
-            else:
-                image_rect = image_to_draw.get_rect(topleft=(x, y))
-                screen.blit(image_to_draw, image_rect)
-            
-            # Grey shade for tiles that cannot be pressed (mask to shape)
-            if tiles_dict is not None and not is_free and self.mask_surface:
-                shade = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                shade.fill((0, 0, 0, 70))
-                shade.blit(self.mask_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-                screen.blit(shade, (x, y))
-
-            
-            # Subtle top-edge highlight for stacked tiles
-            if self.pos.z > 0 and self.mask_outline:
-                highlight = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                pygame.draw.lines(highlight, (255, 255, 255, 90), True, self.mask_outline, 2)
-                screen.blit(highlight, (x, y - 1))
-
-            # Draw gold border for selected tiles - masked to domino outline
-            if self.is_selected and self.mask_outline:
-                border_surf = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                pygame.draw.lines(border_surf, (255, 215, 0, 220), True, self.mask_outline, 4)
-                screen.blit(border_surf, (x, y))
-            elif self.is_hint and self.mask_outline:
-                border_surf = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                pygame.draw.lines(border_surf, (50, 255, 100, 220), True, self.mask_outline, 4)
-                screen.blit(border_surf, (x, y))
+        shadow_alpha, is_free, is_hovered = self.sprite_state(board, is_hovered, max_z)
+        
+        # Sprites are one pixel taller at the top for the stacked highlight
+        if self.flip_active:
+            # Flip animation (scale X to 0 then back)
+            screen.blit(sprites.get(self, shadow_alpha, is_free, is_hovered, TileSprites.UNDER),
+                        (x, y - 1), special_flags=pygame.BLEND_PREMULTIPLIED)
+            image_to_draw = self.image if self.face_up or sprites.face_down_image is None else sprites.face_down_image
+            scale_x = abs(1.0 - (self.flip_progress * 2.0))
+            scaled = sprites.flip_frame(image_to_draw, scale_x)
+            draw_x = x + (TILE_WIDTH - scaled.get_width()) // 2
+            screen.blit(scaled, (draw_x, y))
+            screen.blit(sprites.get(self, shadow_alpha, is_free, is_hovered, TileSprites.OVER),
+                        (x, y - 1), special_flags=pygame.BLEND_PREMULTIPLIED)
+        else:
+            screen.blit(sprites.get(self, shadow_alpha, is_free, is_hovered),
+                        (x, y - 1), special_flags=pygame.BLEND_PREMULTIPLIED)
     
     def contains_point(self, px: int, py: int) -> bool:
         """Check if point is inside tile"""
@@ -316,6 +521,130 @@ class Tile:
             return False
         return self.mask.get_at((local_x, local_y)) == 1
 
+class DrawOrder:
+    """Tiles in painter order, kept sorted across matches and undos.
+
+    Built once per level; removing or restoring a tile finds its slot by
+    bisecting the parallel list of draw keys.
+    """
+
+    def __init__(self, tiles: List["Tile"] = ()):
+        self.tiles: List["Tile"] = sorted(tiles, key=lambda tile: tile.draw_key)
+        self.keys = [tile.draw_key for tile in self.tiles]
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def add(self, tile: "Tile"):
+        index = bisect.bisect_left(self.keys, tile.draw_key)
+        self.keys.insert(index, tile.draw_key)
+        self.tiles.insert(index, tile)
+
+    def remove(self, tile: "Tile"):
+        index = bisect.bisect_left(self.keys, tile.draw_key)
+        if index < len(self.tiles) and self.tiles[index] is tile:
+            del self.keys[index]
+            del self.tiles[index]
+
+class TileGrid:
+    """Uniform grid over tile render rects, for picking the tile under a point.
+
+    Built from tiles in painter order (back to front); each cell lists its
+    overlapping tiles in that order, so picking walks only a few tiles,
+    topmost first.
+    """
+
+    def __init__(self, tiles: List["Tile"], cell_width: int = GRID_STEP_X, cell_height: int = GRID_STEP_Y):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}
+        for tile in tiles:
+            for cell_x in range(tile.render_x // cell_width, (tile.render_x + TILE_WIDTH) // cell_width + 1):
+                for cell_y in range(tile.render_y // cell_height, (tile.render_y + TILE_HEIGHT) // cell_height + 1):
+                    self.cells.setdefault((cell_x, cell_y), []).append(tile)
+
+    def pick(self, x: int, y: int) -> Optional["Tile"]:
+        """Topmost tile whose mask covers the point"""
+        for tile in reversed(self.cells.get((x // self.cell_width, y // self.cell_height), ())):
+            if tile.contains_point(x, y):
+                return tile
+        return None
+
+class BoardLayer:
+    """The background with every resting tile baked in, re-rendered only where tiles change.
+
+    The look each tile was baked with is remembered, so a click, match, flip
+    or hover change only redraws the rectangles of the tiles it touched.
+    Shaking and flipping tiles stay out of the layer and are drawn over it
+    every frame, together with the tiles around them to keep the stacking order.
+    """
+
+    FULL_REDRAW_RECTS = 24  # Past this many changed rects, rebake the whole layer
+
+    def __init__(self, background: pygame.Surface):
+        self.background = background
+        self.surface = background.copy()
+        self.baked = {}  # Tile -> (look, rect) currently in the layer, None look if animating
+        self.live_rects: List[pygame.Rect] = []  # Where animating tiles were drawn last frame
+
+    def draw(self, screen: pygame.Surface, tiles: List["Tile"], animating: set, sprites: TileSprites,
+             board: Optional[Board], hovered_tile: Optional["Tile"], max_z: int) -> List[pygame.Rect]:
+        """Update the changed parts of the layer and draw the board; tiles go back to front.
+
+        animating holds the tiles the animator is still moving this frame.
+        Returns the screen rects that may differ from the previous frame.
+        """
+        looks = {}
+        live = []
+        for tile in tiles:
+            if tile in animating:
+                looks[tile] = None
+                live.append(tile)
+            else:
+                looks[tile] = tile.look(board, tile is hovered_tile, max_z)
+        
+        # Old rects of tiles that changed or left the board, then their new rects
+        dirty = [rect for tile, (look, rect) in self.baked.items()
+                 if tile not in looks or looks[tile] != look]
+        baked = {}
+        for tile, look in looks.items():
+            previous = self.baked.get(tile)
+            if previous is not None and previous[0] == look and look is not None:
+                baked[tile] = previous
+                continue
+            rect = tile.bounds()
+            if previous is None or previous[0] != look:
+                dirty.append(rect)
+            baked[tile] = (look, rect)
+        self.baked = baked
+        
+        if len(dirty) > self.FULL_REDRAW_RECTS:
+            dirty = [self.surface.get_rect()]
+        for rect in dirty:
+            self.redraw(self.surface, rect, tiles, sprites, board, hovered_tile, max_z, resting_only=True)
+        screen.blit(self.surface, (0, 0))
+        
+        live_rects = [baked[tile][1] for tile in live]
+        if len(live_rects) > self.FULL_REDRAW_RECTS:
+            # Mass flips: one pass over the combined area beats overlapping repaints
+            live_rects = [live_rects[0].unionall(live_rects[1:])]
+        for rect in live_rects:
+            self.redraw(screen, rect, tiles, sprites, board, hovered_tile, max_z)
+        changed = dirty + live_rects + self.live_rects
+        self.live_rects = live_rects
+        return changed
+
+    def redraw(self, surface: pygame.Surface, rect: pygame.Rect, tiles: List["Tile"], sprites: TileSprites,
+               board: Optional[Board], hovered_tile: Optional["Tile"], max_z: int, resting_only: bool = False):
+        """Repaint one region from the background up through every tile overlapping it"""
+        surface.set_clip(rect)
+        surface.blit(self.background, rect, rect)
+        for tile in tiles:
+            look, tile_rect = self.baked[tile]
+            if (look is not None or not resting_only) and tile_rect.colliderect(rect):
+                tile.draw(surface, sprites, board, tile is hovered_tile, max_z)
+        surface.set_clip(None)
+
 class Button:
     def __init__(self, x: int, y: int, width: int, height: int, text: str, 
                  color: Tuple[int, int, int], hover_color: Tuple[int, int, int], game=None):
@@ -326,15 +655,41 @@ class Button:
         self.is_hovered = False
         self.scale = 1.0
         self.game = game
+        self.drawn_rect = self.rect.copy()  # Everything the last draw() touched
+        
+    def render_text(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+                    alpha: Optional[int] = None) -> pygame.Surface:
+        """Render through the game's text cache when the button belongs to a game"""
+        if self.game is not None:
+            return self.game.text_cache.render(font, text, color, alpha)
+        return render_text(font, text, color, alpha)
+        
+    def set_hovered(self, hovered: bool):
+        """Change the hover state, easing the button's scale towards it"""
+        if hovered == self.is_hovered:
+            return
+        self.is_hovered = hovered
+        if self.game is not None:
+            self.game.animator.start(self, "scale", self.update_scale)
+        else:
+            self.scale = 1.05 if hovered else 1.0
         
-    def draw(self, screen: pygame.Surface, font: pygame.font.Font, number_font: pygame.font.Font = None):
-        # Smooth scaling animation
+    def update_scale(self, now: int) -> bool:
+        """Smooth scaling animation; False once the scale has settled"""
         target_scale = 1.05 if self.is_hovered else 1.0
         self.scale += (target_scale - self.scale) * 0.3
+        if abs(target_scale - self.scale) < BUTTON_SCALE_STEP / 2:
+            self.scale = target_scale
+            return False
+        return True
+        
+    def draw(self, screen: pygame.Surface, font: pygame.font.Font, number_font: pygame.font.Font = None):
+        # Drawn at a quantised scale so the easing reuses a handful of cached backgrounds
+        scale = round(self.scale / BUTTON_SCALE_STEP) * BUTTON_SCALE_STEP
         
         # Calculate scaled rect - make it larger to accommodate background
-        scaled_width = int(self.rect.width * self.scale)
-        scaled_height = int(self.rect.height * self.scale)
+        scaled_width = int(self.rect.width * scale)
+        scaled_height = int(self.rect.height * scale)
         scaled_rect = pygame.Rect(
             self.rect.centerx - scaled_width // 2,
             self.rect.centery - scaled_height // 2,
@@ -347,14 +702,9 @@ class Button:
             # Add extra padding to background for better fit
             bg_width = scaled_width + 40
             bg_height = scaled_height + 20
-            button_bg = pygame.transform.smoothscale(self.game.button_background_original, (bg_width, bg_height))
-            
             # Apply slight brightness boost if hovered - subtle, not flashbang
-            if self.is_hovered:
-                button_bg = button_bg.copy()
-                bright_overlay = pygame.Surface((bg_width, bg_height), pygame.SRCALPHA)
-                bright_overlay.fill((255, 220, 150, 30))  # Warm glow instead of white
-                button_bg.blit(bright_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            glow = (255, 220, 150, 30) if self.is_hovered else None  # Warm glow instead of white
+            button_bg = self.game.backgrounds.get(self.game.button_background_original, (bg_width, bg_height), glow)
             
             # Center the larger background
             bg_rect = pygame.Rect(
@@ -364,11 +714,13 @@ class Button:
                 bg_height
             )
             screen.blit(button_bg, bg_rect)
+            self.drawn_rect = bg_rect
         else:
             # Fallback to solid color with shadow
             shadow_surf = pygame.Surface((scaled_width + 10, scaled_height + 10), pygame.SRCALPHA)
             pygame.draw.rect(shadow_surf, (0, 0, 0, 120), shadow_surf.get_rect(), border_radius=15)
             screen.blit(shadow_surf, (scaled_rect.x - 5, scaled_rect.y + 5))
+            self.drawn_rect = scaled_rect.union(shadow_surf.get_rect(topleft=(scaled_rect.x - 5, scaled_rect.y + 5)))
             
             color = self.hover_color if self.is_hovered else self.color
             pygame.draw.rect(screen, color, scaled_rect, border_radius=12)
@@ -376,46 +728,68 @@ class Button:
         # Draw text with shadow for depth
         if self.text:
             # Text shadow - more prominent
-            text_shadow = font.render(self.text, True, (0, 0, 0))
-            text_shadow.set_alpha(220)
+            text_shadow = self.render_text(font, self.text, (0, 0, 0), 220)
             text_shadow_rect = text_shadow.get_rect(center=(scaled_rect.centerx + 2, scaled_rect.centery + 2))
             screen.blit(text_shadow, text_shadow_rect)
             
             # Second shadow for extra depth
-            text_shadow2 = font.render(self.text, True, (0, 0, 0))
-            text_shadow2.set_alpha(120)
+            text_shadow2 = self.render_text(font, self.text, (0, 0, 0), 120)
             text_shadow2_rect = text_shadow2.get_rect(center=(scaled_rect.centerx + 3, scaled_rect.centery + 3))
             screen.blit(text_shadow2, text_shadow2_rect)
             
             # Main text
-            text_surface = font.render(self.text, True, TEXT_WHITE)
+            text_surface = self.render_text(font, self.text, TEXT_WHITE)
             text_rect = text_surface.get_rect(center=scaled_rect.center)
             screen.blit(text_surface, text_rect)
-        
-    def handle_event(self, event: pygame.event.Event) -> bool:
-        if event.type == pygame.MOUSEMOTION:
-            self.is_hovered = self.rect.collidepoint(event.pos)
-        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.is_hovered:
-                if self.game and hasattr(self.game, "play_sound"):
-                    self.game.play_sound(self.game.button_press_sound)
-                return True
-        return False
+            self.drawn_rect = self.drawn_rect.union(text_rect.union(text_shadow2_rect))
 
 class Level:
     def __init__(self, name: str, layout_function, difficulty: str):
         self.name = name
         self.layout_function = layout_function
         self.difficulty = difficulty
+        self.graph: Optional[LayoutGraph] = None  # Compiled on first start
+        self.render_positions = {}  # Position -> tile top-left on screen, centred for the full layout
+
+    def compile(self):
+        """Build the layout graph and screen placement the first time the level starts"""
+        if self.graph is None:
+            self.graph = LayoutGraph(self.layout_function())
+            self.place(WINDOW_WIDTH, WINDOW_HEIGHT)
+
+    def place(self, window_width: int, window_height: int):
+        """Centre the full layout in the window and precompute every tile's screen position"""
+        positions = self.graph.positions
+        # Pixel bounds based on actual spacing and layer offsets
+        min_render_x = min(pos.x * GRID_STEP_X + pos.z * LAYER_OFFSET_X for pos in positions)
+        min_render_y = min(pos.y * GRID_STEP_Y + pos.z * LAYER_OFFSET_Y for pos in positions)
+        max_render_x = max(pos.x * GRID_STEP_X + pos.z * LAYER_OFFSET_X + TILE_WIDTH for pos in positions)
+        max_render_y = max(pos.y * GRID_STEP_Y + pos.z * LAYER_OFFSET_Y + TILE_HEIGHT for pos in positions)
+        pixel_width = max_render_x - min_render_x
+        pixel_height = max_render_y - min_render_y
+        
+        # Calculate offsets to center the layout
+        offset_x = int((window_width - pixel_width) // 2 - min_render_x)
+        offset_y = int((window_height - pixel_height) // 2 - min_render_y + 80)  # Extra space for top UI
+        self.render_positions = {pos: screen_position(pos, offset_x, offset_y) for pos in positions}
 
 class MahjongGame:
     def __init__(self):
+        init_pygame()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Mahjong Solitaire - Match & Clear")
         self.clock = pygame.time.Clock()
         self.running = True
+        self.frames_drawn = 0
+        self.idle_ms = 0  # Time spent asleep waiting for input
         self.game_state = HOME_SCREEN
         self.hovered_tile = None  # Track which tile is being hovered
+        self.mouse_pos = pygame.mouse.get_pos()  # Latest cursor position seen in the event queue
+        self.hover_stale = True  # Cursor or board changed since hover was last worked out
+        self.hover_screen = None  # Screen the hover was last worked out for
+        self.text_cache = TextCache()
+        self.backgrounds = BackgroundCache()
+        self.gradients = {}  # (size, top, bottom) -> gradient surface, see gradient()
         
         # Load fonts
         self.load_fonts()
@@ -428,17 +802,25 @@ class MahjongGame:
         
         # Levels with updated names
         self.levels = [
-            Level("Turtle", self.create_pyramid_layout, "Easy"),
-            Level("Temple", self.create_temple_layout, "Medium"),
-            Level("Diamond Peaks", self.create_dragon_layout, "Hard")
+            Level("Turtle", create_pyramid_layout, "Easy"),
+            Level("Temple", create_temple_layout, "Medium"),
+            Level("Diamond Peaks", create_dragon_layout, "Hard")
         ]
         self.current_level_index = 0
         self.max_unlocked_level = 0
         self.lock_shake_until = [0 for _ in self.levels]
+        self.lock_shake_offsets = [0 for _ in self.levels]
+        
+        # Every running animation, advanced once per frame
+        self.animator = Animator()
         
         # Game state
         self.tiles: List[Tile] = []
         self.tiles_dict: dict = {}
+        self.draw_order = DrawOrder()  # self.tiles in painter order
+        self.tile_grid: Optional[TileGrid] = None  # Picking index, rebuilt when the tiles change
+        self.max_z = 0  # Highest layer still on the board
+        self.board: Optional[Board] = None
         self.selected_tile: Optional[Tile] = None
         self.start_time = 0
         self.elapsed_time = 0
@@ -458,6 +840,20 @@ class MahjongGame:
         self.pending_tiles: Optional[Tuple[Tile, Tile]] = None
         self.pending_match: bool = False
         self.pending_until: int = 0
+
+        # Background solver for the current position, stepped a few ms per frame
+        self.hint_engine: Optional[HintEngine] = None
+        self.dead_end = False  # Current position proven unwinnable
+        
+        # Background plus resting tiles, re-rendered only where the board changes
+        self.board_layer = BoardLayer(self.main_background)
+        
+        # Dirty-rect presentation: only changed areas of the game screen reach the display
+        self.dirty_rects: List[pygame.Rect] = []
+        self.tracked = {}  # HUD element -> (rect, state) presented last frame
+        self.tracked_now = {}  # Same, for the frame being drawn
+        self.presented_screen = None  # Screen shown by the last present()
+        self.full_present = True  # Next present() must flip the whole display
         
         # Buttons
         self.create_buttons()
@@ -566,6 +962,7 @@ class MahjongGame:
         """Load UI icon images"""
         self.volume_icon = None
         self.mute_icon = None
+        self.mute_icon_sprites = {}  # (icon, hovered) -> icon and glow, see mute_icon_sprite()
         images_path = Path("src/Images")
         try:
             volume_path = images_path / "Volume.png"
@@ -582,16 +979,16 @@ class MahjongGame:
     
     def create_gradient_background(self):
         """Create gradient background as fallback"""
-        background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        for y in range(WINDOW_HEIGHT):
-            ratio = y / WINDOW_HEIGHT
-            color = (
-                int(BG_GRADIENT_TOP[0] + (BG_GRADIENT_BOTTOM[0] - BG_GRADIENT_TOP[0]) * ratio),
-                int(BG_GRADIENT_TOP[1] + (BG_GRADIENT_BOTTOM[1] - BG_GRADIENT_TOP[1]) * ratio),
-                int(BG_GRADIENT_TOP[2] + (BG_GRADIENT_BOTTOM[2] - BG_GRADIENT_TOP[2]) * ratio)
-            )
-            pygame.draw.line(background, color, (0, y), (WINDOW_WIDTH, y))
-        return background
+        return self.gradient((WINDOW_WIDTH, WINDOW_HEIGHT), BG_GRADIENT_TOP, BG_GRADIENT_BOTTOM)
+        
+    def gradient(self, size: Tuple[int, int], top: Tuple[int, int, int],
+                 bottom: Tuple[int, int, int]) -> pygame.Surface:
+        """Shared vertical gradient surface, rendered on first use; callers must not draw on it"""
+        key = (tuple(size), tuple(top), tuple(bottom))
+        surface = self.gradients.get(key)
+        if surface is None:
+            surface = self.gradients[key] = render_gradient(size, top, bottom)
+        return surface
 
     def load_sounds(self):
         """Load sound effects"""
@@ -667,8 +1064,18 @@ class MahjongGame:
             return
 
         # Icon-only button
+        sprite = self.mute_icon_sprite(icon, self.mute_button.is_hovered)
+        self.mute_button.drawn_rect = sprite.get_rect(center=self.mute_button.rect.center)
+        self.screen.blit(sprite, self.mute_button.drawn_rect, special_flags=pygame.BLEND_PREMULTIPLIED)
+        
+    def mute_icon_sprite(self, icon: pygame.Surface, hovered: bool) -> pygame.Surface:
+        """The scaled icon over its glow layers in one premultiplied surface, built once per icon and state"""
+        key = (icon, hovered)
+        sprite = self.mute_icon_sprites.get(key)
+        if sprite is not None:
+            return sprite
         rect = self.mute_button.rect
-        scale = 1.12 if self.mute_button.is_hovered else 1.0
+        scale = 1.12 if hovered else 1.0
         icon_size = int(min(rect.width, rect.height) * 1.0 * scale)
         icon_size = max(icon_size, 1)
         icon_surf = pygame.transform.smoothscale(icon, (icon_size, icon_size))
@@ -679,16 +1086,25 @@ class MahjongGame:
             (1.35, 110),
             (1.18, 150),
         ]
-        if self.mute_button.is_hovered:
+        if hovered:
             glow_layers = [(scale * 1.1, min(alpha + 30, 200)) for scale, alpha in glow_layers]
+        layers = []
         for scale_factor, alpha in glow_layers:
             glow_size = int(icon_size * scale_factor)
             glow_surface = pygame.transform.smoothscale(base_glow, (glow_size, glow_size))
-            glow_surface.set_alpha(alpha)
-            glow_rect = glow_surface.get_rect(center=rect.center)
-            self.screen.blit(glow_surface, glow_rect)
-        icon_rect = icon_surf.get_rect(center=rect.center)
-        self.screen.blit(icon_surf, icon_rect)
+            glow_surface.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            layers.append(glow_surface)
+        layers.append(icon_surf)
+        
+        # Every layer is centred, like the separate blits this replaces
+        size = max(layer.get_width() for layer in layers)
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        sprite.fill((0, 0, 0, 0))
+        for layer in layers:
+            offset = size // 2 - layer.get_width() // 2
+            sprite.blit(layer.premul_alpha(), (offset, offset), special_flags=pygame.BLEND_PREMULTIPLIED)
+        self.mute_icon_sprites[key] = sprite
+        return sprite
     
     def load_dominos(self):
         """Load domino images from dominos folder"""
@@ -729,6 +1145,7 @@ class MahjongGame:
                 print(f"Error loading {domino_file}: {e}")
         
         print(f"Loaded {len(self.domino_images)} domino images")
+        self.domino_masks = [DominoMask(image) for image in self.domino_images]
 
         # Load face-down domino for medium/hard levels
         face_down_path = dominos_path / "face-down-domino.png"
@@ -739,6 +1156,8 @@ class MahjongGame:
             except Exception as e:
                 print(f"Error loading face-down-domino.png: {e}")
 
+        self.tile_sprites = TileSprites(self.face_down_image, self.domino_images)
+
     def _prepare_domino_image(self, domino_file: Path) -> pygame.Surface:
         """Resize to standard tile size without cropping."""
         if Image is not None:
@@ -752,133 +1171,9 @@ class MahjongGame:
             image = pygame.image.load(str(domino_file)).convert_alpha()
             return pygame.transform.smoothscale(image, (TILE_WIDTH, TILE_HEIGHT))
 
-    def create_pyramid_layout(self) -> List[TilePosition]:
-        """Easy level - Turtle shape (~90 tiles, 3 layers)"""
-        positions = []
-        occupied = set()
-        
-        def add_tile(tx: int, ty: int, z: int):
-            key = (tx, ty, z)
-            if key not in occupied:
-                occupied.add(key)
-                positions.append(TilePosition(tx, ty, z))
-        
-        def add_rect(x0: int, y0: int, w: int, h: int, z: int):
-            for ty in range(y0, y0 + h):
-                for tx in range(x0, x0 + w):
-                    add_tile(tx, ty, z)
-        
-        # Core turtle shell (84 tiles)
-        # Layer 0: 9x6
-        add_rect(0, 0, 9, 6, 0)
-        # Layer 1: 6x4 centered
-        add_rect(1, 1, 6, 4, 1)
-        # Layer 2: 3x2 centered
-        add_rect(3, 2, 3, 2, 2)
-        
-        # Add side legs to reach 90 tiles (3 per side)
-        add_rect(-1, 2, 1, 3, 0)
-        add_rect(9, 2, 1, 3, 0)
-        
-        return positions
-    
-    def create_temple_layout(self) -> List[TilePosition]:
-        """Medium level - Temple layout (~88-90 tiles, 3 layers)"""
-        layout = [
-            # === LAYER 0 (Bottom) ===
-            # Top row
-            (0, 0, 0), (2, 0, 0), (4, 0, 0), (6, 0, 0), (8, 0, 0), (10, 0, 0), (12, 0, 0), (14, 0, 0),
-            # Second row
-            (1, 1, 0), (3, 1, 0), (5, 1, 0), (7, 1, 0), (9, 1, 0), (11, 1, 0), (13, 1, 0),
-            # Third row (main body)
-            (0, 2, 0), (1, 2, 0), (2, 2, 0), (3, 2, 0), (4, 2, 0), (5, 2, 0), (6, 2, 0),
-            (7, 2, 0), (8, 2, 0), (9, 2, 0), (10, 2, 0), (11, 2, 0), (12, 2, 0), (13, 2, 0),
-            (14, 2, 0),
-            # Fourth row (main body)
-            (1, 3, 0), (2, 3, 0), (3, 3, 0), (4, 3, 0), (5, 3, 0), (6, 3, 0), (7, 3, 0),
-            (8, 3, 0), (9, 3, 0), (10, 3, 0), (11, 3, 0), (12, 3, 0), (13, 3, 0),
-            # Fifth row (main body)
-            (2, 4, 0), (3, 4, 0), (4, 4, 0), (5, 4, 0), (6, 4, 0), (7, 4, 0),
-            (8, 4, 0), (9, 4, 0), (10, 4, 0), (11, 4, 0), (12, 4, 0),
-            # Sixth row
-            (3, 5, 0), (4, 5, 0), (5, 5, 0), (6, 5, 0), (7, 5, 0), (8, 5, 0),
-            (9, 5, 0), (10, 5, 0), (11, 5, 0),
-            # Bottom row
-            (0, 6, 0), (2, 6, 0), (4, 6, 0), (6, 6, 0), (8, 6, 0), (10, 6, 0), (12, 6, 0),
-            (14, 6, 0),
-
-            # === LAYER 1 (Middle) ===
-            (2, 1, 1), (3, 1, 1), (4, 1, 1), (5, 1, 1), (6, 1, 1), (7, 1, 1), (8, 1, 1),
-            (9, 1, 1), (10, 1, 1), (11, 1, 1), (12, 1, 1),
-            (2, 2, 1), (3, 2, 1), (4, 2, 1), (5, 2, 1), (6, 2, 1), (7, 2, 1), (8, 2, 1),
-            (9, 2, 1), (10, 2, 1), (11, 2, 1), (12, 2, 1),
-            (2, 3, 1), (3, 3, 1), (4, 3, 1), (5, 3, 1), (6, 3, 1), (7, 3, 1), (8, 3, 1),
-            (9, 3, 1), (10, 3, 1), (11, 3, 1), (12, 3, 1),
-            (2, 4, 1), (3, 4, 1), (4, 4, 1), (5, 4, 1), (6, 4, 1), (7, 4, 1), (8, 4, 1),
-            (9, 4, 1), (10, 4, 1), (11, 4, 1), (12, 4, 1),
-            (4, 5, 1), (5, 5, 1), (6, 5, 1), (7, 5, 1), (8, 5, 1), (9, 5, 1), (10, 5, 1),
-
-            # === LAYER 2 (Top) ===
-            (6, 2, 2), (7, 2, 2), (6, 3, 2), (7, 3, 2),
-        ]
-
-        return [TilePosition(x, y, z) for x, y, z in layout]
-    
-    def create_dragon_layout(self) -> List[TilePosition]:
-        """Hard level - Double Pyramid/Diamond layout (~88-92 tiles, 5 layers)"""
-        layout = [
-            # === LAYER 0 (Bottom/Base) ===
-            (6, 0, 0), (7, 0, 0), (8, 0, 0),
-            (4, 1, 0), (5, 1, 0), (6, 1, 0), (7, 1, 0), (8, 1, 0), (9, 1, 0), (10, 1, 0),
-            (2, 2, 0), (3, 2, 0), (4, 2, 0), (5, 2, 0), (6, 2, 0), (7, 2, 0), (8, 2, 0),
-            (9, 2, 0), (10, 2, 0), (11, 2, 0), (12, 2, 0),
-            (1, 3, 0), (2, 3, 0), (3, 3, 0), (4, 3, 0), (5, 3, 0), (6, 3, 0), (7, 3, 0),
-            (8, 3, 0), (9, 3, 0), (10, 3, 0), (11, 3, 0), (12, 3, 0), (13, 3, 0),
-            (0, 4, 0), (1, 4, 0), (2, 4, 0), (3, 4, 0), (4, 4, 0), (5, 4, 0), (6, 4, 0),
-            (7, 4, 0), (8, 4, 0), (9, 4, 0), (10, 4, 0), (11, 4, 0), (12, 4, 0),
-            (13, 4, 0), (14, 4, 0),
-            (1, 5, 0), (2, 5, 0), (3, 5, 0), (4, 5, 0), (5, 5, 0), (6, 5, 0), (7, 5, 0),
-            (8, 5, 0), (9, 5, 0), (10, 5, 0), (11, 5, 0), (12, 5, 0), (13, 5, 0),
-            (2, 6, 0), (3, 6, 0), (4, 6, 0), (5, 6, 0), (6, 6, 0), (7, 6, 0), (8, 6, 0),
-            (9, 6, 0), (10, 6, 0), (11, 6, 0), (12, 6, 0),
-            (4, 7, 0), (5, 7, 0), (6, 7, 0), (7, 7, 0), (8, 7, 0), (9, 7, 0), (10, 7, 0),
-            (6, 8, 0), (7, 8, 0), (8, 8, 0),
-
-            # === LAYER 1 (First Inner Layer) ===
-            (5, 1, 1), (6, 1, 1), (7, 1, 1), (8, 1, 1), (9, 1, 1),
-            (3, 2, 1), (4, 2, 1), (5, 2, 1), (6, 2, 1), (7, 2, 1), (8, 2, 1), (9, 2, 1),
-            (10, 2, 1), (11, 2, 1),
-            (2, 3, 1), (3, 3, 1), (4, 3, 1), (5, 3, 1), (6, 3, 1), (7, 3, 1), (8, 3, 1),
-            (9, 3, 1), (10, 3, 1), (11, 3, 1), (12, 3, 1),
-            (2, 4, 1), (3, 4, 1), (4, 4, 1), (5, 4, 1), (6, 4, 1), (7, 4, 1), (8, 4, 1),
-            (9, 4, 1), (10, 4, 1), (11, 4, 1), (12, 4, 1),
-            (2, 5, 1), (3, 5, 1), (4, 5, 1), (5, 5, 1), (6, 5, 1), (7, 5, 1), (8, 5, 1),
-            (9, 5, 1), (10, 5, 1), (11, 5, 1), (12, 5, 1),
-            (3, 6, 1), (4, 6, 1), (5, 6, 1), (6, 6, 1), (7, 6, 1), (8, 6, 1), (9, 6, 1),
-            (10, 6, 1), (11, 6, 1),
-            (5, 7, 1), (6, 7, 1), (7, 7, 1), (8, 7, 1), (9, 7, 1),
-
-            # === LAYER 2 (Second Inner Layer) ===
-            (4, 2, 2), (5, 2, 2), (6, 2, 2), (7, 2, 2), (8, 2, 2), (9, 2, 2), (10, 2, 2),
-            (4, 3, 2), (5, 3, 2), (6, 3, 2), (7, 3, 2), (8, 3, 2), (9, 3, 2), (10, 3, 2),
-            (4, 4, 2), (5, 4, 2), (6, 4, 2), (7, 4, 2), (8, 4, 2), (9, 4, 2), (10, 4, 2),
-            (4, 5, 2), (5, 5, 2), (6, 5, 2), (7, 5, 2), (8, 5, 2), (9, 5, 2), (10, 5, 2),
-            (4, 6, 2), (5, 6, 2), (6, 6, 2), (7, 6, 2), (8, 6, 2), (9, 6, 2), (10, 6, 2),
-
-            # === LAYER 3 (Pre-Peak Layer) ===
-            (5, 3, 3), (6, 3, 3), (7, 3, 3), (8, 3, 3), (9, 3, 3),
-            (5, 4, 3), (6, 4, 3), (7, 4, 3), (8, 4, 3), (9, 4, 3),
-            (5, 5, 3), (6, 5, 3), (7, 5, 3), (8, 5, 3), (9, 5, 3),
-
-            # === LAYER 4 (Twin Peaks) ===
-            (5, 3, 4), (5, 4, 4),
-            (9, 3, 4), (9, 4, 4),
-        ]
-
-        return [TilePosition(x, y, z) for x, y, z in layout]
-    
-    def create_tiles_from_layout(self, positions: List[TilePosition]):
-        """Create tiles from position layout with guaranteed even distribution for winnability"""
+    def create_tiles_from_layout(self, positions: List[TilePosition], graph: Optional[LayoutGraph] = None):
+        """Deal a new board for the layout and create a tile for every position"""
+        self.cancel_pending_match()
         self.tiles = []
         self.tiles_dict = {}
         self.selected_tile = None
@@ -891,84 +1186,67 @@ class MahjongGame:
         self.mixes_left = 3
         self.move_history = []
         
-        # We need pairs, so ensure even number of positions
-        if len(positions) % 2 != 0:
-            positions = positions[:-1]
-        
-        # CRITICAL: Create EVEN distribution - every character appears EXACTLY the same number of times
-        num_pairs = len(positions) // 2
-        num_dominos = len(self.domino_images)
-        character_ids = []
-        
-        # Calculate how many times each character should appear
-        pairs_per_character = num_pairs // num_dominos
-        remainder = num_pairs % num_dominos
-        
-        # Add equal pairs for each character
-        for char_id in range(num_dominos):
-            for _ in range(pairs_per_character):
-                character_ids.append(char_id)
-        
-        # Distribute remainder evenly
-        for i in range(remainder):
-            character_ids.append(i)
-        
-        # Now we have exactly num_pairs character IDs
-        # Duplicate for pairs (each character appears twice)
-        character_ids = character_ids * 2
-        
-        # Shuffle to randomize positions
-        random.shuffle(character_ids)
-        
-        # Verify we have the right number
-        assert len(character_ids) == len(positions), f"Mismatch: {len(character_ids)} ids for {len(positions)} positions"
+        # Balanced per character and solvable by construction (dealt backwards)
+        self.board = Board(positions, len(self.domino_images), graph)
+        characters = self.board.deal()
         
         # Create tiles
-        for i, pos in enumerate(positions):
-            char_id = character_ids[i]
+        for pos in self.board.positions:
+            char_id = characters[pos]
             image = self.domino_images[char_id]
-            tile = Tile(pos, char_id, image)
+            tile = Tile(pos, char_id, image, self.domino_masks[char_id])
             self.tiles.append(tile)
             self.tiles_dict[pos] = tile
+        self.draw_order = DrawOrder(self.tiles)
+        self.tiles_changed()
         
         self.update_moves_count()
         self.update_face_states()
+        self.hint_engine = HintEngine(self.board)
+        self.dead_end = False
+
+    def update_analysis(self):
+        """Advance the background search within this frame's time budget"""
+        if not self.hint_engine:
+            return
+        self.hint_engine.step(SOLVER_FRAME_BUDGET_MS / 1000)
+        self.dead_end = self.hint_engine.lost
+        if self.dead_end and not self.pending_tiles and self.mixes_left == 0:
+            # Nothing left to rescue the board unless an undo is still possible
+            if self.undos_left <= 0 or not self.move_history:
+                self.game_state = GAME_OVER
 
     def update_face_states(self):
         """Flip tiles based on level rules."""
         if self.current_level_index == 0:
             for tile in self.tiles:
-                tile.set_face_state(True, animate=False)
+                tile.set_face_state(True)
             return
         for tile in self.tiles:
             if self.pending_tiles and tile in self.pending_tiles:
-                tile.set_face_state(True, animate=False)
+                tile.set_face_state(True)
                 continue
-            is_free = tile.is_free(self.tiles_dict)
+            is_free = self.board.is_free(tile.pos)
             if is_free:
-                tile.set_face_state(tile.is_selected or tile.is_hint)
+                tile.set_face_state(tile.is_selected or tile.is_hint, self.animator)
             else:
-                tile.set_face_state(True)
+                tile.set_face_state(True, self.animator)
         
     def start_level(self, level_index: int):
         """Start a specific level"""
         self.current_level_index = level_index
         level = self.levels[level_index]
         self.elapsed_time = 0
-        positions = level.layout_function()
-        self.create_tiles_from_layout(positions)
+        level.compile()
+        self.create_tiles_from_layout(level.graph.positions, level.graph)
+        for tile in self.tiles:
+            tile.render_x, tile.render_y = level.render_positions[tile.pos]
         self.start_time = pygame.time.get_ticks()
         self.game_state = PLAYING
         
     def update_moves_count(self):
         """Count available matching pairs"""
-        self.moves_left = 0
-        free_tiles = [t for t in self.tiles if t.is_free(self.tiles_dict)]
-        
-        for i, tile1 in enumerate(free_tiles):
-            for tile2 in free_tiles[i + 1:]:
-                if tile1.character_id == tile2.character_id:
-                    self.moves_left += 1
+        self.moves_left = self.board.count_moves()
         
     def show_hint(self):
         """Highlight a matching pair"""
@@ -980,16 +1258,16 @@ class MahjongGame:
             tile.is_hint = False
         self.hint_tiles = []
         
-        free_tiles = [t for t in self.tiles if t.is_free(self.tiles_dict)]
-        
-        for i, tile1 in enumerate(free_tiles):
-            for tile2 in free_tiles[i + 1:]:
-                if tile1.character_id == tile2.character_id:
-                    tile1.is_hint = True
-                    tile2.is_hint = True
-                    self.hint_tiles = [tile1, tile2]
-                    self.hints_left -= 1
-                    return
+        # Prefer the next move of a known winning line over just any matching pair
+        pair = self.hint_engine.hint() if self.hint_engine else None
+        if pair is None:
+            pair = self.board.find_match()
+        if pair:
+            tile1, tile2 = self.tiles_dict[pair[0]], self.tiles_dict[pair[1]]
+            tile1.is_hint = True
+            tile2.is_hint = True
+            self.hint_tiles = [tile1, tile2]
+            self.hints_left -= 1
     
     def undo_move(self):
         """Undo the last move"""
@@ -998,10 +1276,15 @@ class MahjongGame:
         
         # Get the last matched pair
         tile1, tile2 = self.move_history.pop()
+        self.board.undo()
+        self.hint_engine.on_undo(tile1.pos, tile2.pos)
         
         # Add tiles back to the game
         self.tiles.append(tile1)
         self.tiles.append(tile2)
+        self.draw_order.add(tile1)
+        self.draw_order.add(tile2)
+        self.tiles_changed()
         self.tiles_dict[tile1.pos] = tile1
         self.tiles_dict[tile2.pos] = tile2
         
@@ -1021,15 +1304,12 @@ class MahjongGame:
         if self.mixes_left <= 0:
             return
         
-        # Get all character IDs from remaining tiles
-        character_ids = [tile.character_id for tile in self.tiles]
-        random.shuffle(character_ids)
+        self.board.shuffle()
         
         # Reassign character IDs and images to tiles
-        for i, tile in enumerate(self.tiles):
-            tile.character_id = character_ids[i]
-            tile.image = self.domino_images[character_ids[i]]
-            tile.refresh_mask()
+        for tile in self.tiles:
+            tile.character_id = self.board.character_at(tile.pos)
+            tile.set_image(self.domino_images[tile.character_id], self.domino_masks[tile.character_id])
             tile.is_selected = False
             tile.is_hint = False
         
@@ -1037,15 +1317,16 @@ class MahjongGame:
         self.mixes_left -= 1
         self.update_moves_count()
         self.update_face_states()
+        self.hint_engine.on_shuffle()
         
     def handle_tile_click(self, tile: Tile):
         """Handle clicking on a tile"""
         if self.pending_tiles:
             return
         # Check if tile is free first
-        if not tile.is_free(self.tiles_dict):
+        if not self.board.is_free(tile.pos):
             # Tile is blocked - shake it and deselect any selected tile
-            tile.shake()
+            tile.shake(self.animator)
             self.play_sound(self.incorrect_domino_sound)
             if self.selected_tile:
                 self.selected_tile.is_selected = False
@@ -1074,33 +1355,27 @@ class MahjongGame:
                 self.play_sound(self.correct_domino_sound)
                 # Match found! keep both up briefly, then remove
                 tile.is_selected = True
-                tile.set_face_state(True, animate=True)
-                self.selected_tile.set_face_state(True, animate=True)
+                tile.set_face_state(True, self.animator)
+                self.selected_tile.set_face_state(True, self.animator)
                 self.pending_tiles = (self.selected_tile, tile)
                 self.pending_match = True
-                self.pending_until = pygame.time.get_ticks() + MATCH_REVEAL_DELAY + tile.flip_duration
+                self.pending_until = self.animator.now + MATCH_REVEAL_DELAY + tile.flip_duration
+                self.animator.start(self, "reveal", self.update_pending_match)
             else:
                 # No match, switch selection
                 tile.is_selected = True
-                tile.set_face_state(True, animate=True)
-                self.selected_tile.set_face_state(True, animate=True)
+                tile.set_face_state(True, self.animator)
+                self.selected_tile.set_face_state(True, self.animator)
                 self.pending_tiles = (self.selected_tile, tile)
                 self.pending_match = False
-                self.pending_until = pygame.time.get_ticks() + MATCH_REVEAL_DELAY + tile.flip_duration
+                self.pending_until = self.animator.now + MATCH_REVEAL_DELAY + tile.flip_duration
+                self.animator.start(self, "reveal", self.update_pending_match)
     
     def draw_gradient_rect(self, surface: pygame.Surface, rect: pygame.Rect, 
                           color1: Tuple[int, int, int], color2: Tuple[int, int, int]):
         """Draw a rectangle with vertical gradient"""
-        for y in range(rect.height):
-            ratio = y / rect.height
-            color = (
-                int(color1[0] + (color2[0] - color1[0]) * ratio),
-                int(color1[1] + (color2[1] - color1[1]) * ratio),
-                int(color1[2] + (color2[2] - color1[2]) * ratio)
-            )
-            pygame.draw.line(surface, color, 
-                           (rect.x, rect.y + y), 
-                           (rect.x + rect.width, rect.y + y))
+        if rect.width > 0 and rect.height > 0:
+            surface.blit(self.gradient(rect.size, color1, color2), rect)
     
     def draw_home_screen(self):
         """Draw modern home screen"""
@@ -1109,20 +1384,20 @@ class MahjongGame:
         # Draw text background for title and subtitle
         if self.text_background_original:
             # Calculate size needed for title + subtitle
-            title_text = self.title_font.render("MAHJONG", True, TEXT_WHITE)
-            subtitle = self.subtitle_font.render("SOLITAIRE", True, (255, 215, 100))
+            title_text = self.text_cache.render(self.title_font, "MAHJONG", TEXT_WHITE)
+            subtitle = self.text_cache.render(self.subtitle_font, "SOLITAIRE", (255, 215, 100))
             
             # Size the text background to fit both title and subtitle with padding
             text_bg_width = max(title_text.get_width(), subtitle.get_width()) + 120
             text_bg_height = title_text.get_height() + subtitle.get_height() + 60
             
-            text_bg = pygame.transform.smoothscale(self.text_background_original, (text_bg_width, text_bg_height))
+            text_bg = self.backgrounds.get(self.text_background_original, (text_bg_width, text_bg_height))
             text_bg_x = WINDOW_WIDTH // 2 - text_bg_width // 2
             text_bg_y = 100
             self.screen.blit(text_bg, (text_bg_x, text_bg_y))
             
             # Draw title with shadow on top of background
-            title_shadow = self.title_font.render("MAHJONG", True, (0, 0, 0))
+            title_shadow = self.text_cache.render(self.title_font, "MAHJONG", (0, 0, 0))
             self.screen.blit(title_shadow, (WINDOW_WIDTH // 2 - title_text.get_width() // 2 + 3, text_bg_y + 23))
             self.screen.blit(title_text, (WINDOW_WIDTH // 2 - title_text.get_width() // 2, text_bg_y + 20))
             
@@ -1130,12 +1405,12 @@ class MahjongGame:
             self.screen.blit(subtitle, (WINDOW_WIDTH // 2 - subtitle.get_width() // 2, text_bg_y + title_text.get_height() + 30))
         else:
             # Fallback without background
-            title_shadow = self.title_font.render("MAHJONG", True, (0, 0, 0))
-            title_text = self.title_font.render("MAHJONG", True, TEXT_WHITE)
+            title_shadow = self.text_cache.render(self.title_font, "MAHJONG", (0, 0, 0))
+            title_text = self.text_cache.render(self.title_font, "MAHJONG", TEXT_WHITE)
             self.screen.blit(title_shadow, (WINDOW_WIDTH // 2 - title_text.get_width() // 2 + 3, 153))
             self.screen.blit(title_text, (WINDOW_WIDTH // 2 - title_text.get_width() // 2, 150))
             
-            subtitle = self.subtitle_font.render("SOLITAIRE", True, (255, 215, 100))
+            subtitle = self.text_cache.render(self.subtitle_font, "SOLITAIRE", (255, 215, 100))
             self.screen.blit(subtitle, (WINDOW_WIDTH // 2 - subtitle.get_width() // 2, 240))
         
         # Instructions with text background - more spacing
@@ -1146,13 +1421,13 @@ class MahjongGame:
         ]
         y = 540
         for text in instructions:
-            surf = self.small_font.render(text, True, TEXT_WHITE)
+            surf = self.text_cache.render(self.small_font, text, TEXT_WHITE)
             
             # Draw text background for each instruction - much larger
             if self.text_background_original:
                 instr_bg_width = surf.get_width() + 120  # More padding
                 instr_bg_height = surf.get_height() + 30  # More padding
-                instr_bg = pygame.transform.smoothscale(self.text_background_original, (instr_bg_width, instr_bg_height))
+                instr_bg = self.backgrounds.get(self.text_background_original, (instr_bg_width, instr_bg_height))
                 instr_bg_x = WINDOW_WIDTH // 2 - instr_bg_width // 2
                 self.screen.blit(instr_bg, (instr_bg_x, y - 10))
             
@@ -1197,14 +1472,13 @@ class MahjongGame:
         self.screen.blit(self.main_background, (0, 0))
         
         # Title with larger background and shadow
-        title = self.button_font.render("SELECT LEVEL", True, TEXT_WHITE)
-        title_shadow = self.button_font.render("SELECT LEVEL", True, (0, 0, 0))
-        title_shadow.set_alpha(200)
+        title = self.text_cache.render(self.button_font, "SELECT LEVEL", TEXT_WHITE)
+        title_shadow = self.text_cache.render(self.button_font, "SELECT LEVEL", (0, 0, 0), 200)
         
         if self.text_background_original:
             title_bg_width = title.get_width() + 180  # Larger background
             title_bg_height = title.get_height() + 50
-            title_bg = pygame.transform.smoothscale(self.text_background_original, (title_bg_width, title_bg_height))
+            title_bg = self.backgrounds.get(self.text_background_original, (title_bg_width, title_bg_height))
             title_bg_x = WINDOW_WIDTH // 2 - title_bg_width // 2
             self.screen.blit(title_bg, (title_bg_x, 60))
             title_x = WINDOW_WIDTH // 2 - title.get_width() // 2
@@ -1219,34 +1493,24 @@ class MahjongGame:
         for i, (btn, level) in enumerate(zip(self.level_buttons, self.levels)):
             is_locked = i > self.max_unlocked_level
             if is_locked:
-                btn.is_hovered = False
-            shake_offset = 0
-            if is_locked and i < len(self.lock_shake_until):
-                now = pygame.time.get_ticks()
-                if now < self.lock_shake_until[i]:
-                    shake_offset = int(math.sin(now * 0.05) * 6)
+                btn.set_hovered(False)
+            shake_offset = self.lock_shake_offsets[i] if is_locked else 0
             # Draw text background (textBG) instead of buttonBG
             if self.text_background_original:
                 level_bg_width = btn.rect.width + 60
                 level_bg_height = btn.rect.height + 40
-                level_bg = pygame.transform.smoothscale(self.text_background_original, (level_bg_width, level_bg_height))
+                # Apply brightness if hovered - subtle warm glow
+                glow = (255, 220, 150, 30) if btn.is_hovered and not is_locked else None
+                level_bg = self.backgrounds.get(self.text_background_original, (level_bg_width, level_bg_height), glow)
                 level_bg_x = btn.rect.centerx - level_bg_width // 2 + shake_offset
                 level_bg_y = btn.rect.centery - level_bg_height // 2
                 
-                # Apply brightness if hovered - subtle warm glow
-                if btn.is_hovered and not is_locked:
-                    level_bg = level_bg.copy()
-                    bright_overlay = pygame.Surface((level_bg_width, level_bg_height), pygame.SRCALPHA)
-                    bright_overlay.fill((255, 220, 150, 30))
-                    level_bg.blit(bright_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-                
                 self.screen.blit(level_bg, (level_bg_x, level_bg_y))
             
             if is_locked:
                 lock_color = (200, 200, 200)
-                lock_text = self.small_font.render("LOCKED", True, lock_color)
-                lock_shadow = self.small_font.render("LOCKED", True, (0, 0, 0))
-                lock_shadow.set_alpha(200)
+                lock_text = self.text_cache.render(self.small_font, "LOCKED", lock_color)
+                lock_shadow = self.text_cache.render(self.small_font, "LOCKED", (0, 0, 0), 200)
                 lock_x = btn.rect.centerx - lock_text.get_width() // 2 + shake_offset
                 lock_y = btn.rect.centery - lock_text.get_height() // 2 + 18
                 self.draw_lock_icon(btn.rect.centerx + shake_offset, btn.rect.centery - 22, 50, lock_color)
@@ -1255,14 +1519,14 @@ class MahjongGame:
                 continue
             
             # Level info on button - use Yusei font with shadows
-            level_num_label = self.button_font.render("LEVEL ", True, TEXT_WHITE)
-            level_num_label_shadow = self.button_font.render("LEVEL ", True, (0, 0, 0))
-            level_num_value = self.button_font.render(f"{i + 1}", True, TEXT_WHITE)
-            level_num_value_shadow = self.button_font.render(f"{i + 1}", True, (0, 0, 0))
-            name_text = self.small_font.render(level.name, True, TEXT_WHITE)
-            name_text_shadow = self.small_font.render(level.name, True, (0, 0, 0))
-            diff_text = self.tiny_font.render(level.difficulty, True, (200, 255, 200))
-            diff_text_shadow = self.tiny_font.render(level.difficulty, True, (0, 0, 0))
+            level_num_label = self.text_cache.render(self.button_font, "LEVEL ", TEXT_WHITE)
+            level_num_label_shadow = self.text_cache.render(self.button_font, "LEVEL ", (0, 0, 0), 200)
+            level_num_value = self.text_cache.render(self.button_font, f"{i + 1}", TEXT_WHITE)
+            level_num_value_shadow = self.text_cache.render(self.button_font, f"{i + 1}", (0, 0, 0), 200)
+            name_text = self.text_cache.render(self.small_font, level.name, TEXT_WHITE)
+            name_text_shadow = self.text_cache.render(self.small_font, level.name, (0, 0, 0), 200)
+            diff_text = self.text_cache.render(self.tiny_font, level.difficulty, (200, 255, 200))
+            diff_text_shadow = self.text_cache.render(self.tiny_font, level.difficulty, (0, 0, 0), 200)
             
             btn_center_x = btn.rect.centerx
             
@@ -1271,8 +1535,6 @@ class MahjongGame:
             level_start_x = btn_center_x - level_combined_width // 2
             
             # Shadows
-            level_num_label_shadow.set_alpha(200)
-            level_num_value_shadow.set_alpha(200)
             self.screen.blit(level_num_label_shadow, (level_start_x + 2, btn.rect.y + 32))
             self.screen.blit(level_num_value_shadow, (level_start_x + level_num_label.get_width() + 2, btn.rect.y + 32))
             # Text
@@ -1280,32 +1542,24 @@ class MahjongGame:
             self.screen.blit(level_num_value, (level_start_x + level_num_label.get_width(), btn.rect.y + 30))
             
             # Name with shadow
-            name_text_shadow.set_alpha(200)
             self.screen.blit(name_text_shadow, (btn_center_x - name_text.get_width() // 2 + 2, btn.rect.y + 87))
             self.screen.blit(name_text, (btn_center_x - name_text.get_width() // 2, btn.rect.y + 85))
             
             # Difficulty with shadow
-            diff_text_shadow.set_alpha(200)
             self.screen.blit(diff_text_shadow, (btn_center_x - diff_text.get_width() // 2 + 2, btn.rect.y + 132))
             self.screen.blit(diff_text, (btn_center_x - diff_text.get_width() // 2, btn.rect.y + 130))
         
         # Back button with larger background - smaller text with shadow
         if self.text_background_original:
-            back_text = self.tiny_font.render("BACK", True, TEXT_WHITE)
-            back_text_shadow = self.tiny_font.render("BACK", True, (0, 0, 0))
-            back_text_shadow.set_alpha(200)
+            back_text = self.text_cache.render(self.tiny_font, "BACK", TEXT_WHITE)
+            back_text_shadow = self.text_cache.render(self.tiny_font, "BACK", (0, 0, 0), 200)
             back_bg_width = back_text.get_width() + 100
             back_bg_height = back_text.get_height() + 40
-            back_bg = pygame.transform.smoothscale(self.text_background_original, (back_bg_width, back_bg_height))
+            glow = (255, 220, 150, 30) if self.back_button.is_hovered else None
+            back_bg = self.backgrounds.get(self.text_background_original, (back_bg_width, back_bg_height), glow)
             back_bg_x = self.back_button.rect.centerx - back_bg_width // 2
             back_bg_y = self.back_button.rect.centery - back_bg_height // 2
             
-            if self.back_button.is_hovered:
-                back_bg = back_bg.copy()
-                bright_overlay = pygame.Surface((back_bg_width, back_bg_height), pygame.SRCALPHA)
-                bright_overlay.fill((255, 220, 150, 30))
-                back_bg.blit(bright_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-            
             self.screen.blit(back_bg, (back_bg_x, back_bg_y))
             text_x = self.back_button.rect.centerx - back_text.get_width() // 2
             text_y = self.back_button.rect.centery - back_text.get_height() // 2
@@ -1314,9 +1568,27 @@ class MahjongGame:
         else:
             self.back_button.draw(self.screen, self.tiny_font, self.tiny_font)
         
+    def draw_board(self):
+        """Draw the background and tiles, reusing the baked board layer where nothing changed"""
+        # Draw tiles with depth information and hover state
+        self.dirty_rects.extend(self.board_layer.draw(self.screen, self.draw_order.tiles, self.animator.running,
+                                                      self.tile_sprites, self.board, self.hovered_tile, self.max_z))
+
+    def pick_tile(self, pos: Tuple[int, int]) -> Optional[Tile]:
+        """Topmost tile drawn under a screen point"""
+        if self.tile_grid is None:
+            self.tile_grid = TileGrid(self.draw_order.tiles)
+        return self.tile_grid.pick(pos[0], pos[1])
+        
+    def tiles_changed(self):
+        """Refresh what depends on which tiles are on the board"""
+        self.tile_grid = None
+        self.max_z = max((tile.pos.z for tile in self.tiles), default=0)
+        self.hover_stale = True
+        
     def draw_game_screen(self):
         """Draw the main game"""
-        self.screen.blit(self.main_background, (0, 0))
+        self.draw_board()
         
         # Update timer
         if len(self.tiles) > 0:
@@ -1324,22 +1596,24 @@ class MahjongGame:
         
         # Draw Level info at top with background - use Yusei font with shadow
         level = self.levels[self.current_level_index]
-        level_text = self.game_font.render(f"Level {self.current_level_index + 1}: {level.name}", True, TEXT_WHITE)
-        level_shadow = self.game_font.render(f"Level {self.current_level_index + 1}: {level.name}", True, (0, 0, 0))
-        level_shadow.set_alpha(200)
+        level_text = self.text_cache.render(self.game_font, f"Level {self.current_level_index + 1}: {level.name}", TEXT_WHITE)
+        level_shadow = self.text_cache.render(self.game_font, f"Level {self.current_level_index + 1}: {level.name}", (0, 0, 0), 200)
         
         if self.text_background_original:
             level_bg_width = level_text.get_width() + 100
             level_bg_height = level_text.get_height() + 30
-            level_bg = pygame.transform.smoothscale(self.text_background_original, (level_bg_width, level_bg_height))
+            level_bg = self.backgrounds.get(self.text_background_original, (level_bg_width, level_bg_height))
             level_bg_x = WINDOW_WIDTH // 2 - level_bg_width // 2
             self.screen.blit(level_bg, (level_bg_x, 20))
             text_x = WINDOW_WIDTH // 2 - level_text.get_width() // 2
             self.screen.blit(level_shadow, (text_x + 2, 32))
             self.screen.blit(level_text, (text_x, 30))
+            level_rect = pygame.Rect(level_bg_x, 20, level_bg_width, level_bg_height)
         else:
             self.screen.blit(level_shadow, (32, 22))
             self.screen.blit(level_text, (30, 20))
+            level_rect = pygame.Rect(30, 20, level_text.get_width() + 2, level_text.get_height() + 2)
+        self.track("level", level_rect, level.name)
         
         # Draw stats on the left side with proper spacing and backgrounds - use Yusei for all
         stats_data = [
@@ -1351,12 +1625,10 @@ class MahjongGame:
         y_pos = 120
         for label, value, x_pos in stats_data:
             # Render label and value with Yusei font and shadows
-            label_text = self.small_font.render(label, True, TEXT_WHITE)
-            label_shadow = self.small_font.render(label, True, (0, 0, 0))
-            label_shadow.set_alpha(200)
-            value_text = self.small_font.render(value, True, TEXT_WHITE)
-            value_shadow = self.small_font.render(value, True, (0, 0, 0))
-            value_shadow.set_alpha(200)
+            label_text = self.text_cache.render(self.small_font, label, TEXT_WHITE)
+            label_shadow = self.text_cache.render(self.small_font, label, (0, 0, 0), 200)
+            value_text = self.text_cache.render(self.small_font, value, TEXT_WHITE)
+            value_shadow = self.text_cache.render(self.small_font, value, (0, 0, 0), 200)
             
             # Calculate combined width for background
             combined_width = label_text.get_width() + value_text.get_width() + 20
@@ -1366,7 +1638,7 @@ class MahjongGame:
             if self.text_background_original:
                 stat_bg_width = combined_width + 60
                 stat_bg_height = combined_height + 20
-                stat_bg = pygame.transform.smoothscale(self.text_background_original, (stat_bg_width, stat_bg_height))
+                stat_bg = self.backgrounds.get(self.text_background_original, (stat_bg_width, stat_bg_height))
                 self.screen.blit(stat_bg, (x_pos - 20, y_pos - 5))
             
             # Draw text with shadows
@@ -1374,14 +1646,14 @@ class MahjongGame:
             self.screen.blit(label_text, (x_pos, y_pos))
             self.screen.blit(value_shadow, (x_pos + label_text.get_width() + 12, y_pos + 2))
             self.screen.blit(value_text, (x_pos + label_text.get_width() + 10, y_pos))
+            self.track(label, pygame.Rect(x_pos - 20, y_pos - 5, combined_width + 60, combined_height + 20), value)
             
             y_pos += 60
         
         # Draw buttons on the right side with counters - smaller text with shadows
         # Hint button with counter
-        hint_counter = self.tiny_font.render(f"({self.hints_left})", True, TEXT_WHITE)
-        hint_counter_shadow = self.tiny_font.render(f"({self.hints_left})", True, (0, 0, 0))
-        hint_counter_shadow.set_alpha(200)
+        hint_counter = self.text_cache.render(self.tiny_font, f"({self.hints_left})", TEXT_WHITE)
+        hint_counter_shadow = self.text_cache.render(self.tiny_font, f"({self.hints_left})", (0, 0, 0), 200)
         self.hint_button.draw(self.screen, self.tiny_font, self.tiny_font)
         
         # Draw counter next to button with shadow
@@ -1389,24 +1661,25 @@ class MahjongGame:
         counter_y = self.hint_button.rect.centery - hint_counter.get_height() // 2
         self.screen.blit(hint_counter_shadow, (counter_x + 2, counter_y + 2))
         self.screen.blit(hint_counter, (counter_x, counter_y))
+        self.track_counter("hints", hint_counter, counter_x, counter_y, self.hints_left)
         
         # Undo button with counter
-        undo_counter = self.tiny_font.render(f"({self.undos_left})", True, TEXT_WHITE)
-        undo_counter_shadow = self.tiny_font.render(f"({self.undos_left})", True, (0, 0, 0))
-        undo_counter_shadow.set_alpha(200)
+        undo_counter = self.text_cache.render(self.tiny_font, f"({self.undos_left})", TEXT_WHITE)
+        undo_counter_shadow = self.text_cache.render(self.tiny_font, f"({self.undos_left})", (0, 0, 0), 200)
         self.undo_button.draw(self.screen, self.tiny_font, self.tiny_font)
         counter_y = self.undo_button.rect.centery - undo_counter.get_height() // 2
         self.screen.blit(undo_counter_shadow, (counter_x + 2, counter_y + 2))
         self.screen.blit(undo_counter, (counter_x, counter_y))
+        self.track_counter("undos", undo_counter, counter_x, counter_y, self.undos_left)
         
         # Mix button with counter
-        mix_counter = self.tiny_font.render(f"({self.mixes_left})", True, TEXT_WHITE)
-        mix_counter_shadow = self.tiny_font.render(f"({self.mixes_left})", True, (0, 0, 0))
-        mix_counter_shadow.set_alpha(200)
+        mix_counter = self.text_cache.render(self.tiny_font, f"({self.mixes_left})", TEXT_WHITE)
+        mix_counter_shadow = self.text_cache.render(self.tiny_font, f"({self.mixes_left})", (0, 0, 0), 200)
         self.mix_button.draw(self.screen, self.tiny_font, self.tiny_font)
         counter_y = self.mix_button.rect.centery - mix_counter.get_height() // 2
         self.screen.blit(mix_counter_shadow, (counter_x + 2, counter_y + 2))
         self.screen.blit(mix_counter, (counter_x, counter_y))
+        self.track_counter("mixes", mix_counter, counter_x, counter_y, self.mixes_left)
         
         # Restart button
         self.restart_button.draw(self.screen, self.tiny_font, self.tiny_font)
@@ -1414,70 +1687,67 @@ class MahjongGame:
         # Back button at top right - smaller text
         self.back_button.draw(self.screen, self.tiny_font, self.tiny_font)
         self.draw_mute_button()
-        
-        # Calculate tile positions - dynamically center based on actual pixel bounds
-        if self.tiles:
-            # Find grid coordinate bounds
-            min_x = min(tile.pos.x for tile in self.tiles)
-            max_x = max(tile.pos.x for tile in self.tiles)
-            min_y = min(tile.pos.y for tile in self.tiles)
-            max_y = max(tile.pos.y for tile in self.tiles)
-            max_z = max(tile.pos.z for tile in self.tiles)
-            
-            # Calculate pixel bounds based on actual spacing and layer offsets
-            spacing_x = GRID_STEP_X
-            spacing_y = GRID_STEP_Y
-            min_render_x = float("inf")
-            max_render_x = float("-inf")
-            min_render_y = float("inf")
-            max_render_y = float("-inf")
-            for tile in self.tiles:
-                render_x = tile.pos.x * spacing_x + (tile.pos.z * LAYER_OFFSET_X)
-                render_y = tile.pos.y * spacing_y + (tile.pos.z * LAYER_OFFSET_Y)
-                min_render_x = min(min_render_x, render_x)
-                min_render_y = min(min_render_y, render_y)
-                max_render_x = max(max_render_x, render_x + TILE_WIDTH)
-                max_render_y = max(max_render_y, render_y + TILE_HEIGHT)
-            
-            pixel_width = max_render_x - min_render_x
-            pixel_height = max_render_y - min_render_y
-            
-            # Calculate offsets to center the layout
-            offset_x = int((WINDOW_WIDTH - pixel_width) // 2 - min_render_x)
-            offset_y = int((WINDOW_HEIGHT - pixel_height) // 2 - min_render_y + 80)  # Extra space for top UI
+        for button in (self.hint_button, self.undo_button, self.mix_button, self.restart_button,
+                       self.back_button, self.mute_button):
+            self.track(button, button.drawn_rect, (button.text, button.is_hovered, self.is_muted))
+        
+        if self.dead_end:
+            self.draw_dead_end_banner()
+        
+    def track(self, key, rect: pygame.Rect, state):
+        """Present a HUD element's rect this frame if it moved or shows something new"""
+        previous = self.tracked.get(key)
+        if previous is None or previous[0] != rect or previous[1] != state:
+            self.dirty_rects.append(rect)
+            if previous is not None:
+                self.dirty_rects.append(previous[0])
+        self.tracked_now[key] = (rect, state)
+        
+    def track_counter(self, key: str, text: pygame.Surface, x: int, y: int, value: int):
+        """Track a shadowed power-up counter drawn at (x, y)"""
+        self.track(key, pygame.Rect(x, y, text.get_width() + 2, text.get_height() + 2), value)
+        
+    def present(self):
+        """Show the frame, pushing only the changed rects while a level is on screen"""
+        screen = (self.game_state, self.current_level_index, self.board)
+        if self.full_present or self.game_state != PLAYING or screen != self.presented_screen:
+            pygame.display.flip()
         else:
-            offset_x = WINDOW_WIDTH // 2
-            offset_y = WINDOW_HEIGHT // 2
-        
-        for tile in self.tiles:
-            tile.get_screen_pos(offset_x, offset_y)
-        
-        # Sort tiles for proper rendering (back to front, top-right to bottom-left)
-        sorted_tiles = sorted(
-            self.tiles,
-            key=lambda t: (t.pos.z, t.pos.y + t.pos.x, t.pos.y, t.pos.x)
-        )
-        
-        # Get current mouse position to detect hover
-        mouse_pos = pygame.mouse.get_pos()
-        self.hovered_tile = None
+            # Elements drawn last frame but not this one leave their old area dirty
+            for key, (rect, _) in self.tracked.items():
+                if key not in self.tracked_now:
+                    self.dirty_rects.append(rect)
+            if self.dirty_rects:
+                pygame.display.update(self.dirty_rects)
+        self.presented_screen = screen
+        self.full_present = False
+        self.tracked = self.tracked_now
+        self.tracked_now = {}
+        self.dirty_rects = []
+        
+    def draw_dead_end_banner(self):
+        """Tell the player the board can no longer be won and what they can do"""
+        if self.mixes_left > 0:
+            message = "No winning moves left - try MIX or RESTART"
+        else:
+            message = "No winning moves left - UNDO or RESTART"
+        text = self.text_cache.render(self.small_font, message, TEXT_WHITE)
+        shadow = self.text_cache.render(self.small_font, message, (0, 0, 0), 200)
+        text_x = WINDOW_WIDTH // 2 - text.get_width() // 2
+        text_y = WINDOW_HEIGHT - text.get_height() - 25
         
-        # Find which tile is being hovered (check top tiles first)
-        sorted_tiles_top_first = sorted(
-            self.tiles,
-            key=lambda t: (-t.pos.z, -(t.pos.y + t.pos.x), -t.pos.y, -t.pos.x)
-        )
-        for tile in sorted_tiles_top_first:
-            if tile.contains_point(mouse_pos[0], mouse_pos[1]):
-                if tile.is_free(self.tiles_dict):
-                    self.hovered_tile = tile
-                break
+        if self.text_background_original:
+            bg_width = text.get_width() + 100
+            bg_height = text.get_height() + 30
+            bg = self.backgrounds.get(self.text_background_original, (bg_width, bg_height))
+            self.screen.blit(bg, (WINDOW_WIDTH // 2 - bg_width // 2, text_y - 15))
+            banner_rect = pygame.Rect(WINDOW_WIDTH // 2 - bg_width // 2, text_y - 15, bg_width, bg_height)
+        else:
+            banner_rect = pygame.Rect(text_x, text_y, text.get_width() + 2, text.get_height() + 2)
         
-        # Draw tiles with depth information and hover state
-        max_z = max(tile.pos.z for tile in self.tiles)
-        for tile in sorted_tiles:
-            is_hovered = (tile == self.hovered_tile)
-            tile.draw(self.screen, self.tiles_dict, is_hovered, max_z, self.face_down_image)
+        self.screen.blit(shadow, (text_x + 2, text_y + 2))
+        self.screen.blit(text, (text_x, text_y))
+        self.track("dead_end", banner_rect, message)
         
     def draw_level_complete(self):
         """Draw level complete screen"""
@@ -1489,13 +1759,13 @@ class MahjongGame:
         self.screen.blit(overlay, (0, 0))
         
         # Congratulations with background
-        congrats = self.subtitle_font.render("LEVEL COMPLETE!", True, TEXT_WHITE)
-        congrats_shadow = self.subtitle_font.render("LEVEL COMPLETE!", True, (0, 0, 0))
+        congrats = self.text_cache.render(self.subtitle_font, "LEVEL COMPLETE!", TEXT_WHITE)
+        congrats_shadow = self.text_cache.render(self.subtitle_font, "LEVEL COMPLETE!", (0, 0, 0))
         
         if self.text_background_original:
             congrats_bg_width = congrats.get_width() + 120
             congrats_bg_height = congrats.get_height() + 40
-            congrats_bg = pygame.transform.smoothscale(self.text_background_original, (congrats_bg_width, congrats_bg_height))
+            congrats_bg = self.backgrounds.get(self.text_background_original, (congrats_bg_width, congrats_bg_height))
             congrats_bg_x = WINDOW_WIDTH // 2 - congrats_bg_width // 2
             self.screen.blit(congrats_bg, (congrats_bg_x, 130))
             self.screen.blit(congrats_shadow, (WINDOW_WIDTH // 2 - congrats.get_width() // 2 + 3, 153))
@@ -1512,12 +1782,10 @@ class MahjongGame:
         ]
         y = 300
         for label, value in stats_data:
-            label_text = self.game_font.render(label, True, TEXT_WHITE)
-            label_shadow = self.game_font.render(label, True, (0, 0, 0))
-            label_shadow.set_alpha(200)
-            value_text = self.game_font.render(value, True, TEXT_WHITE)
-            value_shadow = self.game_font.render(value, True, (0, 0, 0))
-            value_shadow.set_alpha(200)
+            label_text = self.text_cache.render(self.game_font, label, TEXT_WHITE)
+            label_shadow = self.text_cache.render(self.game_font, label, (0, 0, 0), 200)
+            value_text = self.text_cache.render(self.game_font, value, TEXT_WHITE)
+            value_shadow = self.text_cache.render(self.game_font, value, (0, 0, 0), 200)
             
             combined_width = label_text.get_width() + value_text.get_width()
             
@@ -1525,7 +1793,7 @@ class MahjongGame:
             if self.text_background_original:
                 stat_bg_width = combined_width + 100
                 stat_bg_height = max(label_text.get_height(), value_text.get_height()) + 30
-                stat_bg = pygame.transform.smoothscale(self.text_background_original, (stat_bg_width, stat_bg_height))
+                stat_bg = self.backgrounds.get(self.text_background_original, (stat_bg_width, stat_bg_height))
                 stat_bg_x = WINDOW_WIDTH // 2 - stat_bg_width // 2
                 self.screen.blit(stat_bg, (stat_bg_x, y - 10))
             
@@ -1553,13 +1821,13 @@ class MahjongGame:
         self.screen.blit(overlay, (0, 0))
         
         # Out of moves title (same styling as win screen)
-        title = self.subtitle_font.render("OUT OF MOVES!", True, TEXT_WHITE)
-        title_shadow = self.subtitle_font.render("OUT OF MOVES!", True, (0, 0, 0))
+        title = self.text_cache.render(self.subtitle_font, "OUT OF MOVES!", TEXT_WHITE)
+        title_shadow = self.text_cache.render(self.subtitle_font, "OUT OF MOVES!", (0, 0, 0))
         
         if self.text_background_original:
             title_bg_width = title.get_width() + 120
             title_bg_height = title.get_height() + 40
-            title_bg = pygame.transform.smoothscale(self.text_background_original, (title_bg_width, title_bg_height))
+            title_bg = self.backgrounds.get(self.text_background_original, (title_bg_width, title_bg_height))
             title_bg_x = WINDOW_WIDTH // 2 - title_bg_width // 2
             self.screen.blit(title_bg, (title_bg_x, 130))
             self.screen.blit(title_shadow, (WINDOW_WIDTH // 2 - title.get_width() // 2 + 3, 153))
@@ -1576,12 +1844,10 @@ class MahjongGame:
         ]
         y = 300
         for label, value in stats_data:
-            label_text = self.game_font.render(label, True, TEXT_WHITE)
-            label_shadow = self.game_font.render(label, True, (0, 0, 0))
-            label_shadow.set_alpha(200)
-            value_text = self.game_font.render(value, True, TEXT_WHITE)
-            value_shadow = self.game_font.render(value, True, (0, 0, 0))
-            value_shadow.set_alpha(200)
+            label_text = self.text_cache.render(self.game_font, label, TEXT_WHITE)
+            label_shadow = self.text_cache.render(self.game_font, label, (0, 0, 0), 200)
+            value_text = self.text_cache.render(self.game_font, value, TEXT_WHITE)
+            value_shadow = self.text_cache.render(self.game_font, value, (0, 0, 0), 200)
             
             combined_width = label_text.get_width() + value_text.get_width()
             
@@ -1589,7 +1855,7 @@ class MahjongGame:
             if self.text_background_original:
                 stat_bg_width = combined_width + 100
                 stat_bg_height = max(label_text.get_height(), value_text.get_height()) + 30
-                stat_bg = pygame.transform.smoothscale(self.text_background_original, (stat_bg_width, stat_bg_height))
+                stat_bg = self.backgrounds.get(self.text_background_original, (stat_bg_width, stat_bg_height))
                 stat_bg_x = WINDOW_WIDTH // 2 - stat_bg_width // 2
                 self.screen.blit(stat_bg, (stat_bg_x, y - 10))
             
@@ -1605,22 +1871,33 @@ class MahjongGame:
         self.retry_button.draw(self.screen, self.tiny_font, self.tiny_font)
         self.menu_button.draw(self.screen, self.tiny_font, self.tiny_font)
         
-    def update_pending_match(self):
+    def update_lock_shake(self, index: int, now: int) -> bool:
+        """Wobble a locked level's button; False once it has stopped"""
+        if now < self.lock_shake_until[index]:
+            self.lock_shake_offsets[index] = int(math.sin(now * 0.05) * 6)
+            return True
+        self.lock_shake_offsets[index] = 0
+        return False
+        
+    def update_pending_match(self, now: int) -> bool:
+        """Resolve the revealed pair once its delay is over; False when nothing is left pending"""
         if not self.pending_tiles:
-            return
-        if pygame.time.get_ticks() < self.pending_until:
-            return
+            return False
+        if now < self.pending_until:
+            return True
         tile1, tile2 = self.pending_tiles
-        if self.pending_match:
+        on_board = tile1 in self.tiles and tile2 in self.tiles
+        if self.pending_match and on_board and self.board.is_match(tile1.pos, tile2.pos):
             # Match found! Store in history for undo
+            self.board.match(tile1.pos, tile2.pos)
             self.move_history.append((tile1, tile2))
-            if tile1 in self.tiles:
-                self.tiles.remove(tile1)
-                del self.tiles_dict[tile1.pos]
-            if tile2 in self.tiles:
-                self.tiles.remove(tile2)
-                del self.tiles_dict[tile2.pos]
+            for tile in (tile1, tile2):
+                self.tiles.remove(tile)
+                self.draw_order.remove(tile)
+                del self.tiles_dict[tile.pos]
+            self.tiles_changed()
             self.matches_made += 1
+            self.hint_engine.on_match(tile1.pos, tile2.pos)
         else:
             # Mismatch: clear selection
             if tile1 in self.tiles:
@@ -1636,98 +1913,148 @@ class MahjongGame:
             self.max_unlocked_level = max(self.max_unlocked_level, self.current_level_index + 1)
             self.game_state = LEVEL_COMPLETE
         else:
+            # A board with no moves left is a dead end; update_analysis() decides when it is over
             self.update_moves_count()
             self.update_face_states()
-            if self.moves_left == 0 and self.mixes_left == 0:
-                self.game_state = GAME_OVER
+        return False
+        
+    def cancel_pending_match(self):
+        """Forget a pair that is still being revealed, e.g. when its board is replaced"""
+        self.pending_tiles = None
+        self.pending_match = False
+        self.pending_until = 0
+        self.animator.stop(self, "reveal")
+        
+    def is_busy(self) -> bool:
+        """Whether the screen would change on its own, without any input"""
+        if self.animator.active:
+            return True
+        return self.game_state == PLAYING and self.hint_engine is not None and self.hint_engine.searching
+        
+    def idle_timeout(self) -> int:
+        """How long the loop may sleep before the screen is due to change anyway"""
+        if self.game_state == PLAYING and self.tiles:
+            # Wake for the timer's next second
+            return 1000 - (pygame.time.get_ticks() - self.start_time) % 1000
+        return IDLE_WAIT_MS
+        
+    def next_events(self) -> List[pygame.event.Event]:
+        """This frame's input; while idle, sleeps until some arrives or the screen is due to change"""
+        events = pygame.event.get()
+        if events or not IDLE_SLEEP or self.is_busy():
+            return events
+        started = pygame.time.get_ticks()
+        event = pygame.event.wait(self.idle_timeout())
+        # Animations started by this input must not begin back before the sleep
+        self.animator.now = pygame.time.get_ticks()
+        self.idle_ms += self.animator.now - started
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+        
+    def hit_map(self) -> List[Tuple[Button, Callable[[], None]]]:
+        """The current screen's buttons, in the order clicks are tried, with what each click does"""
+        if self.game_state == HOME_SCREEN:
+            return [(self.mute_button, self.toggle_mute),
+                    (self.play_button, lambda: self.show_screen(LEVEL_SELECT))]
+        if self.game_state == LEVEL_SELECT:
+            return [(self.back_button, lambda: self.show_screen(HOME_SCREEN))] + [
+                (btn, lambda i=i: self.start_level(i))
+                for i, btn in enumerate(self.level_buttons) if i <= self.max_unlocked_level]
+        if self.game_state == PLAYING:
+            return [(self.mute_button, self.toggle_mute),
+                    (self.back_button, self.leave_level),
+                    (self.hint_button, self.show_hint),
+                    (self.undo_button, self.undo_move),
+                    (self.mix_button, self.mix_tiles),
+                    (self.restart_button, lambda: self.start_level(self.current_level_index))]
+        hits = []
+        if self.game_state == LEVEL_COMPLETE and self.current_level_index < len(self.levels) - 1:
+            hits.append((self.next_level_button, lambda: self.start_level(self.current_level_index + 1)))
+        return hits + [(self.retry_button, lambda: self.start_level(self.current_level_index)),
+                       (self.menu_button, self.leave_level)]
+        
+    def refresh_hover(self):
+        """Work out what is under the cursor, once it has moved or the screen or board changed"""
+        if not self.hover_stale and self.hover_screen == self.game_state:
+            return
+        for button, _ in self.hit_map():
+            button.set_hovered(button.rect.collidepoint(self.mouse_pos))
+        self.hovered_tile = None
+        if self.game_state == PLAYING and self.board is not None:
+            # Hover the topmost tile under the mouse, if it can be played
+            tile = self.pick_tile(self.mouse_pos)
+            self.hovered_tile = tile if tile is not None and self.board.is_free(tile.pos) else None
+        self.hover_screen = self.game_state
+        self.hover_stale = False
+        
+    def handle_click(self, pos: Tuple[int, int]):
+        """Act on a left click through the current screen's hit map"""
+        self.refresh_hover()
+        for button, action in self.hit_map():
+            if button.is_hovered:
+                self.play_sound(self.button_press_sound)
+                action()
+                return
+        if self.game_state == PLAYING:
+            # Click the topmost tile under the cursor
+            tile = self.pick_tile(pos)
+            if tile is not None:
+                self.handle_tile_click(tile)
+        elif self.game_state == LEVEL_SELECT:
+            for i, btn in enumerate(self.level_buttons):
+                if i > self.max_unlocked_level and btn.rect.collidepoint(pos):
+                    self.play_sound(self.incorrect_domino_sound)
+                    if i < len(self.lock_shake_until):
+                        self.lock_shake_until[i] = self.animator.now + 300
+                        self.animator.start(self, f"lock{i}", lambda now, i=i: self.update_lock_shake(i, now))
+                        
+    def show_screen(self, state: int):
+        """Switch to another screen"""
+        self.game_state = state
+        
+    def leave_level(self):
+        """Go back to level select, clearing the level's timer and move count"""
+        self.cancel_pending_match()
+        self.elapsed_time = 0
+        self.moves_left = 0
+        self.start_time = 0
+        self.game_state = LEVEL_SELECT
+        
     def run(self):
         """Main game loop"""
         while self.running:
-            for event in pygame.event.get():
+            for event in self.next_events():
                 if event.type == pygame.QUIT:
                     self.running = False
-                    
-                # Handle events based on game state
-                if self.game_state == HOME_SCREEN:
-                    if self.mute_button.handle_event(event):
-                        self.toggle_mute()
-                    if self.play_button.handle_event(event):
-                        self.game_state = LEVEL_SELECT
-                        
-                elif self.game_state == LEVEL_SELECT:
-                    back_clicked = self.back_button.handle_event(event)
-                    if back_clicked:
-                        self.game_state = HOME_SCREEN
-                    else:
-                        for i, btn in enumerate(self.level_buttons):
-                            if i <= self.max_unlocked_level:
-                                if btn.handle_event(event):
-                                    self.start_level(i)
-                            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                                if btn.rect.collidepoint(event.pos):
-                                    self.play_sound(self.incorrect_domino_sound)
-                                    if i < len(self.lock_shake_until):
-                                        self.lock_shake_until[i] = pygame.time.get_ticks() + 300
-                            
-                elif self.game_state == PLAYING:
-                    if self.mute_button.handle_event(event):
-                        self.toggle_mute()
-                    elif self.back_button.handle_event(event):
-                        self.elapsed_time = 0
-                        self.moves_left = 0
-                        self.start_time = 0
-                        self.game_state = LEVEL_SELECT
-                    elif self.hint_button.handle_event(event):
-                        self.show_hint()
-                    elif self.undo_button.handle_event(event):
-                        self.undo_move()
-                    elif self.mix_button.handle_event(event):
-                        self.mix_tiles()
-                    elif self.restart_button.handle_event(event):
-                        self.start_level(self.current_level_index)
-                    elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                        # Check tile clicks (reverse order for top tiles first)
-                        sorted_tiles = sorted(self.tiles, key=lambda t: (-t.pos.z, -t.render_y, -t.render_x))
-                        for tile in sorted_tiles:
-                            if tile.contains_point(event.pos[0], event.pos[1]):
-                                self.handle_tile_click(tile)
-                                break
-                                
-                elif self.game_state == LEVEL_COMPLETE:
-                    if self.current_level_index < len(self.levels) - 1:
-                        if self.next_level_button.handle_event(event):
-                            self.start_level(self.current_level_index + 1)
-                    if self.retry_button.handle_event(event):
-                        self.start_level(self.current_level_index)
-                    if self.menu_button.handle_event(event):
-                        self.elapsed_time = 0
-                        self.moves_left = 0
-                        self.start_time = 0
-                        self.game_state = LEVEL_SELECT
-                        
-                elif self.game_state == GAME_OVER:
-                    if self.retry_button.handle_event(event):
-                        self.start_level(self.current_level_index)
-                    if self.menu_button.handle_event(event):
-                        self.elapsed_time = 0
-                        self.moves_left = 0
-                        self.start_time = 0
-                        self.game_state = LEVEL_SELECT
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                    self.full_present = True
+                elif event.type == pygame.MOUSEMOTION:
+                    # A flood of motion costs one hover update per frame, at the latest position
+                    self.mouse_pos = event.pos
+                    self.hover_stale = True
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    self.mouse_pos = event.pos
+                    self.hover_stale = True
+                    self.handle_click(event.pos)
             
-            # Draw current screen
+            # Advance animations, then draw current screen
+            self.animator.tick()
+            self.refresh_hover()
             if self.game_state == HOME_SCREEN:
                 self.draw_home_screen()
             elif self.game_state == LEVEL_SELECT:
                 self.draw_level_select()
             elif self.game_state == PLAYING:
-                self.update_pending_match()
+                self.update_analysis()
                 self.draw_game_screen()
             elif self.game_state == LEVEL_COMPLETE:
                 self.draw_level_complete()
             elif self.game_state == GAME_OVER:
                 self.draw_game_over()
                 
-            pygame.display.flip()
+            self.present()
+            self.frames_drawn += 1
             self.clock.tick(FPS)
             
         pygame.quit()
@@ -0,0 +1,739 @@
+"""Exhaustive solver for Mahjong Solitaire boards.
+
+Depth-first search over the remaining-tile set with Zobrist hashing, a
+bounded LRU transposition table of proven-dead states and move ordering.
+Searches that run long are restarted with randomized tie-breaking and a
+larger node budget, which cuts off the heavy tail of unlucky first moves;
+proven-dead states carry over between restarts. Like :mod:`mahjong_engine`,
+nothing here imports pygame.
+
+Run ``python mahjong_solver.py`` to solve fresh deals of every shipped layout
+and report deal quality.
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from mahjong_engine import LAYOUTS, LEFT, RIGHT, TOP, Board, LayoutGraph, Move, TilePosition
+
+DEFAULT_TABLE_SIZE = 200_000  # Dead-state hashes kept in the transposition table
+ANALYSIS_TIME_BUDGET = 0.25  # CPU seconds a HintEngine may spend on one position
+ZOBRIST_SEED = 0x5EED
+RESTART_NODES = 300  # Node budget of the first pass
+RESTART_GROWTH = 1.5  # Budget multiplier for each restart
+RESTART_NOISE = 30  # Random tie-breaking added to move scores after the first pass
+POLL_INTERVAL = 4  # Nodes between clock checks; keeps time-sliced steps within a frame budget
+SPLIT_TASKS_PER_WORKER = 4  # Subtrees handed out per pool worker
+SPLIT_MAX_DEPTH = 8
+SHARED_DEAD_CAPACITY = 1 << 16  # Ring buffer of dead-state hashes shared by workers
+SHARED_DEAD_DEPTH = 6  # Only dead states this close to a subtree root are shared
+SHARED_SYNC_INTERVAL = 256  # Nodes between a worker's checks of the cancel flag and shared dead states
+SHARED_BOARD_CAPACITY = 1 << 16  # Bytes for the pickled board, which workers load once per job
+BENCH_TRIES_PER_DEAL = 200  # Random deals screened for each hard deal the benchmark wants
+
+IndexMove = Tuple[int, int]
+
+
+@dataclass
+class SolveResult:
+    """Outcome of a solver run"""
+    solvable: Optional[bool]  # None when a node or time limit stopped the search
+    moves: List[Move] = field(default_factory=list)  # Winning line from the solved position
+    nodes: int = 0
+    elapsed: float = 0.0  # seconds
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.elapsed * 1000.0
+
+
+class TranspositionTable:
+    """Bounded set of proven-dead state hashes with LRU eviction.
+
+    Only dead states are stored, so evicting an entry never makes the search
+    wrong - it just may have to prove that state dead again.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_TABLE_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, None]" = OrderedDict()
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: int) -> bool:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, key: int):
+        self.entries[key] = None
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+def has_buried_tile(tiles: List[int], covered_by: List[frozenset]) -> bool:
+    """Check if one of these same-character tiles is stacked under all the others"""
+    for i in tiles:
+        cover = covered_by[i]
+        if cover and all(j == i or j in cover for j in tiles):
+            return True
+    return False
+
+
+def quick_dead_end(board: Board) -> bool:
+    """Cheap necessary conditions for a lost position; True means certainly lost.
+
+    Catches boards with no matching pair at all and characters with a tile
+    buried under every other remaining tile of the same character (e.g. the
+    last two of a character stacked on each other). False proves nothing.
+    """
+    if board.remaining and board.count_moves() == 0:
+        return True
+    remaining: List[List[int]] = [[] for _ in board.remaining_by_character]
+    for i, present in enumerate(board.present):
+        if present:
+            remaining[board.tile_characters[i]].append(i)
+    return any(has_buried_tile(tiles, board.graph.covered_by) for tiles in remaining)
+
+
+def zobrist_keys(graph: LayoutGraph, seed: int = ZOBRIST_SEED) -> List[int]:
+    """One random 64-bit key per position; a state hash XORs the present ones"""
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(len(graph))]
+
+
+class Solver:
+    """Search for a winning move sequence from a board position.
+
+    The solver works on its own copy of the board, so the live game board is
+    never touched. Search state lives on an explicit stack rather than the
+    Python call stack, so a search can be paused and resumed: call
+    :meth:`solve` to run to completion, or :meth:`start` then :meth:`step`
+    with a small time budget each frame.
+    """
+
+    def __init__(self, board: Board, table: Optional[TranspositionTable] = None,
+                 keys: Optional[List[int]] = None, seed: int = 0):
+        self.board = board.copy()
+        self.graph = self.board.graph
+        self.table = table if table is not None else TranspositionTable()
+        self.keys = keys if keys is not None else zobrist_keys(self.graph)
+        self.layers = [pos.z for pos in self.graph.positions]
+        self.rng = random.Random(seed)
+        self.noise = 0
+        self.tiles_by_character: List[List[int]] = [[] for _ in self.board.remaining_by_character]
+        for i, char_id in enumerate(self.board.tile_characters):
+            self.tiles_by_character[char_id].append(i)
+        self.hash = 0
+        for i, present in enumerate(self.board.present):
+            if present:
+                self.hash ^= self.keys[i]
+
+    @classmethod
+    def from_characters(cls, characters: Dict[TilePosition, int], **kwargs) -> "Solver":
+        """Solver for a ``tiles_dict``-style mapping of remaining position -> character ID"""
+        return cls(Board.from_characters(characters), **kwargs)
+
+    def apply(self, move: IndexMove):
+        i, j = move
+        self.board.remove_pair(i, j)
+        self.hash ^= self.keys[i] ^ self.keys[j]
+
+    def revert(self, move: IndexMove):
+        i, j = move
+        self.board.restore_pair(i, j)
+        self.hash ^= self.keys[i] ^ self.keys[j]
+
+    def freed_by(self, i: int) -> int:
+        """Count the blocked tiles that removing tile ``i`` would make free"""
+        board = self.board
+        present = board.present
+        free = board.free
+        counts = board.blocker_counts
+        freed = 0
+        for dependent, side in self.graph.blocks[i]:
+            if not present[dependent] or dependent in free:
+                continue
+            top = counts[TOP][dependent] - (side == TOP)
+            left = counts[LEFT][dependent] - (side == LEFT)
+            right = counts[RIGHT][dependent] - (side == RIGHT)
+            if top == 0 and (left == 0 or right == 0):
+                freed += 1
+        return freed
+
+    def is_buried(self, char_id: int) -> bool:
+        """Check if some tile of a character is stacked under every other remaining tile of it.
+
+        That tile can only become free once all its possible partners are
+        gone, so the position is lost.
+        """
+        present = self.board.present
+        return has_buried_tile([i for i in self.tiles_by_character[char_id] if present[i]],
+                               self.graph.covered_by)
+
+    def ordered_moves(self) -> List[IndexMove]:
+        """Legal moves from the current state, most promising first.
+
+        If every remaining tile of a character is free, matching them can never
+        hurt (removing tiles only ever frees others), so that single move is
+        returned on its own. Otherwise moves that free more tiles are tried
+        first, then characters with fewer tiles left, then higher layers.
+        """
+        board = self.board
+        layers = self.layers
+        remaining = board.remaining_by_character
+        characters = board.tile_characters
+        noise = self.noise
+        random_value = self.rng.random
+        moves = []
+        for char_id, bucket in enumerate(board.free_by_character):
+            count = len(bucket)
+            if count < 2:
+                continue
+            free = sorted(bucket)
+            if count == board.remaining_by_character[char_id]:
+                return [(free[0], free[1])]
+            for a in range(count):
+                for b in range(a + 1, count):
+                    moves.append((free[a], free[b]))
+
+        freed = {i: self.freed_by(i) for i in board.free}
+
+        def score(move: IndexMove) -> float:
+            i, j = move
+            value = (freed[i] + freed[j]) * 64 - remaining[characters[i]] * 8 + layers[i] + layers[j]
+            return value + random_value() * noise if noise else value
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def mark_dead(self, depth: int):
+        """Record the current state, ``depth`` moves below the search root, as proven dead"""
+        self.table.add(self.hash)
+
+    def should_stop(self, deadline: Optional[float]) -> bool:
+        """Polled every ``POLL_INTERVAL`` nodes and between passes; True ends the search"""
+        return deadline is not None and time.perf_counter() > deadline
+
+    def solve(self, max_nodes: Optional[int] = None, time_limit: Optional[float] = None) -> SolveResult:
+        """Search until a win is found, the position is proven dead, or a limit is hit"""
+        self.start(max_nodes)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self._run(deadline, pause=False)
+        return self.result
+
+    def start(self, max_nodes: Optional[int] = None):
+        """Begin a resumable search from the current position; drive it with :meth:`step`"""
+        self.max_nodes = max_nodes
+        self.result: Optional[SolveResult] = None
+        self.nodes = 0
+        self.restarts = 0
+        self.elapsed = 0.0
+        self.budget = RESTART_NODES
+        self.noise = 0
+        self._begin_pass()
+
+    def step(self, time_budget: float) -> bool:
+        """Search for at most ``time_budget`` seconds, keeping state between calls.
+
+        Returns True once :attr:`result` is set. Meant to be called once per
+        frame from a game loop with a few milliseconds of budget.
+        """
+        if self.result is not None:
+            return True
+        return self._run(time.perf_counter() + time_budget, pause=True)
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    @property
+    def progress(self) -> float:
+        """Rough fraction (0-1) of the current pass's search tree already covered"""
+        covered = 0.0
+        scale = 1.0
+        for moves, next_index in self.stack:
+            if not moves:
+                break
+            covered += scale * max(next_index - 1, 0) / len(moves)
+            scale /= len(moves)
+        return covered
+
+    def _begin_pass(self):
+        self.pass_nodes = 0
+        self.path: List[IndexMove] = []
+        # Each frame is [moves, index of the next move to try]
+        if any(self.is_buried(char_id) for char_id in range(len(self.tiles_by_character))):
+            self.stack = [[[], 0]]
+        else:
+            self.stack = [[self.ordered_moves(), 0]]
+
+    def _run(self, deadline: Optional[float], pause: bool) -> bool:
+        """Drive passes until a result, or until the deadline (pausing or giving up)"""
+        started = time.perf_counter()
+        try:
+            while True:
+                solvable = self._search(deadline)
+                if solvable is not None:
+                    self._finish(solvable)
+                    return True
+                if self.max_nodes is not None and self.nodes >= self.max_nodes:
+                    self._finish(None)
+                    return True
+                if self.pass_nodes < self.budget or self.should_stop(deadline):
+                    # Stopped by the clock (or a cancel), not by the pass budget
+                    if pause:
+                        return False
+                    self._finish(None)
+                    return True
+                # Restart with a bigger budget and shuffled ties; dead states carry over
+                self._unwind()
+                self.budget = int(self.budget * RESTART_GROWTH)
+                self.noise = RESTART_NOISE
+                self.restarts += 1
+                self._begin_pass()
+        finally:
+            self.elapsed += time.perf_counter() - started
+            if self.result is not None:
+                self.result.elapsed = self.elapsed
+
+    def _unwind(self):
+        """Leave the working board where the search started"""
+        while self.path:
+            self.revert(self.path.pop())
+
+    def _finish(self, solvable: Optional[bool]):
+        positions = self.graph.positions
+        moves = [(positions[i], positions[j]) for i, j in self.path] if solvable else []
+        self._unwind()
+        self.stack = []
+        self.result = SolveResult(solvable, moves, self.nodes, self.elapsed)
+
+    def _search(self, deadline: Optional[float]) -> Optional[bool]:
+        """Continue the current depth-first pass.
+
+        Returns True (won) or False (root proven dead), or None when the pass
+        budget, node limit or deadline stops it; the stack is left resumable.
+        """
+        board = self.board
+        table = self.table
+        path = self.path
+        stack = self.stack
+
+        while True:
+            if board.remaining == 0:
+                return True
+            frame = stack[-1]
+            moves, next_index = frame
+            if next_index < len(moves):
+                frame[1] = next_index + 1
+                move = moves[next_index]
+                self.apply(move)
+                if self.hash in table or self.is_buried(board.tile_characters[move[0]]):
+                    self.revert(move)
+                    continue
+                self.nodes += 1
+                self.pass_nodes += 1
+                path.append(move)
+                stack.append([self.ordered_moves(), 0])
+                if self.pass_nodes >= self.budget:
+                    return None
+                if self.max_nodes is not None and self.nodes >= self.max_nodes:
+                    return None
+                if self.nodes % POLL_INTERVAL == 0 and self.should_stop(deadline):
+                    return None
+                continue
+            # Every move from here fails: remember the state and back up
+            self.mark_dead(len(path))
+            stack.pop()
+            if not path:
+                return False
+            self.revert(path.pop())
+
+
+def solve(board: Board, max_nodes: Optional[int] = None, time_limit: Optional[float] = None) -> SolveResult:
+    """Convenience wrapper: solve a board with a fresh solver"""
+    return Solver(board).solve(max_nodes=max_nodes, time_limit=time_limit)
+
+
+class HintEngine:
+    """Hints and dead-end detection for a live board.
+
+    A background :class:`Solver`, driven through :meth:`step`, looks for a
+    winning line from the current position. While the player plays moves
+    from the line, the cached line stays valid (removing a pair early only
+    ever frees tiles), so a hint is a list lookup. Leaving the line starts a
+    new search from the current position; undoing a move just puts that move
+    back at the front.
+
+    :attr:`lost` is set as soon as :func:`quick_dead_end` or the solver proves
+    the position cannot be won. Each position gets at most ``time_budget``
+    seconds of search; after that it stays undecided until the next move.
+    """
+
+    def __init__(self, board: Board, keys: Optional[List[int]] = None,
+                 time_budget: float = ANALYSIS_TIME_BUDGET):
+        self.board = board
+        self.time_budget = time_budget
+        self.keys = keys if keys is not None else zobrist_keys(board.graph)
+        self.table = TranspositionTable()
+        self.line: Optional[List[Move]] = None  # None until a search finishes
+        self.lost = False  # Proven: no winning line from here
+        self.solver: Optional[Solver] = None
+        self.search()
+
+    @property
+    def searching(self) -> bool:
+        return self.solver is not None
+
+    def search(self):
+        """Start a background search from the board's current position"""
+        self.line = None
+        self.lost = quick_dead_end(self.board)
+        self.solver = None
+        if not self.lost:
+            self.solver = Solver(self.board, table=self.table, keys=self.keys)
+            self.solver.start()
+
+    def step(self, time_budget: float) -> bool:
+        """Advance a pending search; True once the search has finished or given up"""
+        if self.solver is None:
+            return True
+        time_budget = min(time_budget, self.time_budget - self.solver.elapsed)
+        if time_budget <= 0:
+            # Out of budget for this position; stay undecided
+            self.solver = None
+            return True
+        if not self.solver.step(time_budget):
+            return False
+        result = self.solver.result
+        self.solver = None
+        if result.solvable:
+            self.line = list(result.moves)
+        else:
+            self.lost = result.solvable is False
+        return True
+
+    def hint(self) -> Optional[Move]:
+        """Next move of the winning line, or None while searching or when lost"""
+        return self.line[0] if self.line else None
+
+    def on_match(self, a: TilePosition, b: TilePosition):
+        """Keep the cached line if the player's move is on it, otherwise search again"""
+        if self.line is not None:
+            for k, move in enumerate(self.line):
+                if {a, b} == set(move):
+                    del self.line[k]
+                    return
+        elif self.lost:
+            # Every position reachable from a lost one is lost too
+            return
+        self.search()
+
+    def on_undo(self, a: TilePosition, b: TilePosition):
+        if self.line is not None:
+            self.line.insert(0, (a, b))
+            return
+        self.search()
+
+    def on_shuffle(self):
+        """Tile identities changed: cached line and dead states no longer apply"""
+        self.table = TranspositionTable()
+        self.search()
+
+
+def split_frontier(solver: Solver, target: int) -> Tuple[List[List[IndexMove]], Optional[List[IndexMove]]]:
+    """Expand the top of the search tree breadth-first into at least ``target`` subtrees.
+
+    Returns ``(prefixes, winning_line)``. Transpositions and buried states are
+    dropped; an empty prefix list with no winning line means the root is dead.
+    """
+    frontier: List[List[IndexMove]] = [[]]
+    seen = set()
+    for _ in range(SPLIT_MAX_DEPTH):
+        if len(frontier) >= target:
+            break
+        expanded = []
+        for prefix in frontier:
+            for move in prefix:
+                solver.apply(move)
+            for move in solver.ordered_moves():
+                solver.apply(move)
+                if solver.board.remaining == 0:
+                    return [], prefix + [move]
+                if solver.hash not in seen and not solver.is_buried(solver.board.tile_characters[move[0]]):
+                    seen.add(solver.hash)
+                    expanded.append(prefix + [move])
+                solver.revert(move)
+            for move in reversed(prefix):
+                solver.revert(move)
+        frontier = expanded
+        if not frontier:
+            break
+    return frontier, None
+
+
+# Per-process state of pool workers, set up by _init_worker
+_worker_state = {}
+
+
+def _init_worker(cancel, dead_hashes, dead_count, board_bytes, board_size):
+    _worker_state.update(cancel=cancel, dead_hashes=dead_hashes, dead_count=dead_count,
+                         board_bytes=board_bytes, board_size=board_size, job=None, solver=None)
+
+
+class _SharedTableSolver(Solver):
+    """Pool-worker solver that publishes shallow dead states and honours cancellation"""
+
+    def __init__(self, board: Board, cancel, dead_hashes, dead_count):
+        super().__init__(board)
+        self.cancel = cancel
+        self.dead_hashes = dead_hashes
+        self.dead_count = dead_count
+        self.read_cursor = 0
+        self.next_sync = 0  # Node count at which to look at the shared state again
+        self.cancelled = False
+
+    def start(self, max_nodes: Optional[int] = None):
+        super().start(max_nodes)
+        self.next_sync = 0
+        self.cancelled = False
+
+    def mark_dead(self, depth: int):
+        super().mark_dead(depth)
+        if depth <= SHARED_DEAD_DEPTH:
+            with self.dead_count.get_lock():
+                slot = self.dead_count.value
+                self.dead_count.value = slot + 1
+            self.dead_hashes[slot % SHARED_DEAD_CAPACITY] = self.hash
+
+    def should_stop(self, deadline: Optional[float]) -> bool:
+        # The shared flag and counter take locks, so they are read less often than the clock
+        if self.nodes >= self.next_sync:
+            self.next_sync = self.nodes + SHARED_SYNC_INTERVAL
+            self.cancelled = self.cancel.is_set()
+            if not self.cancelled:
+                self.import_dead()
+        return self.cancelled or super().should_stop(deadline)
+
+    def import_dead(self):
+        """Pull in what the other workers proved since the last sync"""
+        count = self.dead_count.value
+        for slot in range(max(self.read_cursor, count - SHARED_DEAD_CAPACITY), count):
+            key = self.dead_hashes[slot % SHARED_DEAD_CAPACITY]
+            if key:
+                self.table.add(key)
+        self.read_cursor = count
+
+
+def _solve_subtree(job: int, prefix: List[IndexMove], deadline: Optional[float],
+                   board: Optional[Board] = None) -> SolveResult:
+    """Pool task: solve the subtree below ``prefix``; ``deadline`` is wall-clock time.
+
+    The job's board is read from the shared buffer, unless it was too large
+    for it and comes with the task.
+    """
+    state = _worker_state
+    if state["job"] != job:
+        # Keep one solver (and its transposition table) per job across tasks
+        if board is None:
+            size = state["board_size"].value
+            board = pickle.loads(memoryview(state["board_bytes"]).cast("B")[:size])
+        state["solver"] = _SharedTableSolver(board, state["cancel"], state["dead_hashes"], state["dead_count"])
+        state["job"] = job
+    solver = state["solver"]
+    time_limit = None
+    if deadline is not None:
+        time_limit = deadline - time.time()
+        if time_limit <= 0:
+            return SolveResult(None)
+    for move in prefix:
+        solver.apply(move)
+    try:
+        return solver.solve(time_limit=time_limit)
+    finally:
+        for move in reversed(prefix):
+            solver.revert(move)
+
+
+class ParallelSolver:
+    """Solve boards with the top of the search tree split across a process pool.
+
+    Workers share a ring buffer of proven-dead state hashes and stop as soon
+    as one of them finds a winning line. Reuse one instance for many boards;
+    starting the pool is far more expensive than a typical solve.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        context = multiprocessing.get_context()
+        self.workers = workers or os.cpu_count() or 1
+        self.cancel = context.Event()
+        self.dead_hashes = context.Array("Q", SHARED_DEAD_CAPACITY, lock=False)
+        self.dead_count = context.Value("q", 0)
+        self.board_bytes = context.Array("B", SHARED_BOARD_CAPACITY, lock=False)
+        self.board_size = context.Value("q", 0)
+        self.executor = ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=_init_worker,
+            initargs=(self.cancel, self.dead_hashes, self.dead_count, self.board_bytes, self.board_size),
+        )
+        self.jobs = 0
+        self.pending = {}  # Future -> prefix of the solve in progress
+
+    def __enter__(self) -> "ParallelSolver":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # Stop whatever an interrupted solve left queued or running; shutdown() alone
+        # would wait for it (cancel_futures= needs Python 3.9)
+        self.cancel.set()
+        for future in self.pending:
+            future.cancel()
+        self.executor.shutdown()
+
+    def solve(self, board: Board, time_limit: Optional[float] = None) -> SolveResult:
+        start = time.perf_counter()
+        deadline = time.time() + time_limit if time_limit is not None else None
+        self.jobs += 1
+        self.cancel.clear()
+        with self.dead_count.get_lock():
+            self.dead_count.value = 0
+            self.dead_hashes[:] = [0] * SHARED_DEAD_CAPACITY
+
+        splitter = Solver(board)
+        positions = splitter.graph.positions
+        prefixes, line = split_frontier(splitter, self.workers * SPLIT_TASKS_PER_WORKER)
+        if line is not None:
+            moves = [(positions[i], positions[j]) for i, j in line]
+            return SolveResult(True, moves, len(line), time.perf_counter() - start)
+
+        # Share the board once for the whole job rather than pickling it into every task
+        data = pickle.dumps(board, pickle.HIGHEST_PROTOCOL)
+        task_board = board
+        if len(data) <= SHARED_BOARD_CAPACITY:
+            memoryview(self.board_bytes).cast("B")[:len(data)] = data
+            self.board_size.value = len(data)
+            task_board = None
+        pending = self.pending = {
+            self.executor.submit(_solve_subtree, self.jobs, prefix, deadline, task_board): prefix
+            for prefix in prefixes
+        }
+        solvable: Optional[bool] = False
+        moves: List[Move] = []
+        nodes = 0
+        while pending and not moves:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                prefix = pending.pop(future)
+                result = future.result()
+                nodes += result.nodes
+                if result.solvable:
+                    solvable = True
+                    moves = [(positions[i], positions[j]) for i, j in prefix] + result.moves
+                    break
+                if result.solvable is None:
+                    solvable = None
+
+        # Stop the rest; running workers notice the flag at their next poll
+        self.cancel.set()
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        self.pending = {}
+        return SolveResult(solvable, moves, nodes, time.perf_counter() - start)
+
+
+def benchmark(worker_counts: List[int], deals: int, seed: int, time_limit: float, min_nodes: int):
+    """Time hard random deals of every shipped layout, sequentially and across pool sizes.
+
+    Only deals the sequential solver cannot decide within ``min_nodes`` nodes
+    are used: easy ones finish in a few ms and would time nothing but pool
+    overhead. Speedups are relative to the sequential :class:`Solver`.
+    """
+    for name, layout_function in LAYOUTS.items():
+        graph = LayoutGraph(layout_function())
+        board = Board(graph.positions, graph=graph)
+        rng = random.Random(seed)
+        boards = []
+        sequential = 0.0
+        decided = 0
+        for _ in range(deals * BENCH_TRIES_PER_DEAL):
+            if len(boards) == deals:
+                break
+            board.deal(rng, solvable=False)
+            if solve(board, max_nodes=min_nodes).solvable is not None:
+                continue
+            started = time.perf_counter()
+            result = solve(board, time_limit=time_limit)
+            sequential += time.perf_counter() - started
+            decided += result.solvable is not None
+            boards.append(board.copy())
+        if not boards:
+            print(f"{name:14s} no deal needed more than {min_nodes} nodes")
+            continue
+        print(f"{name:14s} sequential total={sequential * 1000:8.1f}ms decided={decided}/{len(boards)}")
+
+        for workers in worker_counts:
+            with ParallelSolver(workers) as solver:
+                started = time.perf_counter()
+                results = [solver.solve(b, time_limit=time_limit) for b in boards]
+                elapsed = time.perf_counter() - started
+            decided = sum(1 for r in results if r.solvable is not None)
+            print(f"{name:14s} workers={workers:2d} total={elapsed * 1000:8.1f}ms "
+                  f"decided={decided}/{len(results)} speedup={sequential / elapsed:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve fresh deals of every shipped layout")
+    parser.add_argument("--deals", type=int, default=20, help="deals per layout")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--random-deals", action="store_true",
+                        help="use plain shuffled deals instead of solvable-by-construction ones")
+    parser.add_argument("--time-limit", type=float, default=5.0, help="seconds per deal")
+    parser.add_argument("--bench", action="store_true",
+                        help="benchmark the parallel solver against the sequential one on hard random deals")
+    parser.add_argument("--workers", default="1,2,4,8", help="pool sizes for --bench")
+    parser.add_argument("--min-nodes", type=int, default=1000,
+                        help="for --bench, only use deals the sequential solver needs more nodes than this for")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark([int(w) for w in args.workers.split(",")], args.deals, args.seed, args.time_limit,
+                  args.min_nodes)
+        return
+
+    rng = random.Random(args.seed)
+    for name, layout_function in LAYOUTS.items():
+        graph = LayoutGraph(layout_function())
+        board = Board(graph.positions, graph=graph)
+        results = []
+        for _ in range(args.deals):
+            board.deal(rng, solvable=not args.random_deals)
+            results.append(solve(board, time_limit=args.time_limit))
+        won = sum(1 for r in results if r.solvable)
+        dead = sum(1 for r in results if r.solvable is False)
+        times = sorted(r.elapsed_ms for r in results)
+        print(f"{name:14s} tiles={len(graph):3d} solvable={won}/{len(results)} dead={dead} "
+              f"unknown={len(results) - won - dead} "
+              f"median={times[len(times) // 2]:.1f}ms max={times[-1]:.1f}ms "
+              f"nodes(avg)={sum(r.nodes for r in results) // len(results)}")
+
+
+if __name__ == "__main__":
+    main()